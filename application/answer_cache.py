@@ -0,0 +1,175 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from typing import Optional
+
+from sqlalchemy import Column, Float, Integer, String, Text, create_engine, delete, func, select
+from sqlalchemy.orm import Session, declarative_base
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "ANSWER_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "answer_cache.db")
+)
+DEFAULT_MAX_BYTES = int(float(os.getenv("ANSWER_CACHE_MAX_MB", "64")) * 1024 * 1024)
+
+# Time to live per agent type in seconds: web/news answers go stale quickly,
+# database answers (ChEMBL/UniProt/PDB releases) change slowly
+AGENT_TTLS = {
+    "web_search": 15 * 60,
+    "chembl": 7 * 24 * 3600,
+    "uniprot": 7 * 24 * 3600,
+    "pdb": 7 * 24 * 3600,
+    "multi_agent": 24 * 3600,
+    "multi_agent_parallel": 24 * 3600,
+}
+DEFAULT_TTL = 3600
+
+Base = declarative_base()
+
+
+class CachedAnswer(Base):
+    __tablename__ = "answers"
+
+    key = Column(String(64), primary_key=True)
+    agent_type = Column(String(32), nullable=False)
+    model_id = Column(String(128), nullable=False)
+    reasoning_mode = Column(String(16), nullable=False)
+    query = Column(Text, nullable=False)
+    answer = Column(Text, nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(Float, nullable=False)
+    expires_at = Column(Float, nullable=False, index=True)
+    last_hit = Column(Float, nullable=False, index=True)
+    hits = Column(Integer, nullable=False, default=0)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a question so trivially different spellings share a cache entry"""
+    query = unicodedata.normalize("NFKC", query).lower()
+    query = re.sub(r"\s+", " ", query).strip()
+    return query.rstrip(" ?.!")
+
+
+class AnswerCache:
+    """SQLite-backed cache of final agent answers with per-agent TTLs and size-based eviction"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES, ttls: dict = None):
+        """
+        Args:
+            path: SQLite database file
+            max_bytes: Total answer size kept before the least recently hit entries are evicted
+            ttls: Time to live in seconds per agent type
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = ttls or AGENT_TTLS
+        self._engine = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @property
+    def engine(self):
+        # Created lazily so importing the module does not touch the disk
+        with self._lock:
+            if self._engine is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._engine = create_engine(f"sqlite:///{self.path}")
+                Base.metadata.create_all(self._engine)
+            return self._engine
+
+    @staticmethod
+    def make_key(query: str, agent_type: str, model_id: str, reasoning_mode: str) -> str:
+        payload = json.dumps([normalize_query(query), agent_type, model_id, reasoning_mode], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, query: str, agent_type: str, model_id: str, reasoning_mode: str) -> Optional[str]:
+        """
+        Look up a cached answer
+
+        Returns:
+            The cached answer, or None on a miss or expired entry
+        """
+        key = self.make_key(query, agent_type, model_id, reasoning_mode)
+        now = time.time()
+        try:
+            with Session(self.engine) as session:
+                entry = session.get(CachedAnswer, key)
+                if entry is None or entry.expires_at < now:
+                    if entry is not None:
+                        session.delete(entry)
+                        session.commit()
+                    self._stats["misses"] += 1
+                    return None
+                entry.hits += 1
+                entry.last_hit = now
+                answer = entry.answer
+                session.commit()
+        except Exception as e:
+            logger.error(f"Answer cache lookup failed: {e}")
+            return None
+        self._stats["hits"] += 1
+        logger.info(f"Answer cache hit: {agent_type}")
+        return answer
+
+    def put(self, query: str, agent_type: str, model_id: str, reasoning_mode: str, answer: str):
+        """Store an answer and evict old entries if the cache grew past its size budget"""
+        if not answer:
+            return
+        now = time.time()
+        entry = CachedAnswer(
+            key=self.make_key(query, agent_type, model_id, reasoning_mode),
+            agent_type=agent_type,
+            model_id=model_id,
+            reasoning_mode=reasoning_mode,
+            query=normalize_query(query),
+            answer=answer,
+            size=len(answer.encode("utf-8")),
+            created_at=now,
+            expires_at=now + self.ttls.get(agent_type, DEFAULT_TTL),
+            last_hit=now,
+            hits=0,
+        )
+        try:
+            with Session(self.engine) as session:
+                session.merge(entry)
+                session.commit()
+            self._stats["stores"] += 1
+            self.evict()
+        except Exception as e:
+            logger.error(f"Answer cache store failed: {e}")
+
+    def evict(self):
+        """Drop expired entries, then the least recently hit ones until the size budget is met"""
+        now = time.time()
+        with Session(self.engine) as session:
+            session.execute(delete(CachedAnswer).where(CachedAnswer.expires_at < now))
+            total = session.scalar(select(func.coalesce(func.sum(CachedAnswer.size), 0)))
+            if total > self.max_bytes:
+                rows = session.execute(
+                    select(CachedAnswer.key, CachedAnswer.size).order_by(CachedAnswer.last_hit)
+                ).all()
+                stale = []
+                for key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    stale.append(key)
+                    total -= size
+                session.execute(delete(CachedAnswer).where(CachedAnswer.key.in_(stale)))
+                self._stats["evictions"] += len(stale)
+            session.commit()
+
+    def clear(self):
+        """Remove every cached answer"""
+        with Session(self.engine) as session:
+            session.execute(delete(CachedAnswer))
+            session.commit()
+
+    def get_stats(self) -> dict:
+        """Get hit/miss/store/eviction counters"""
+        return dict(self._stats)
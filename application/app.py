@@ -1,7 +1,11 @@
 import streamlit as st
-import chat
+# chat (Strands, botocore, MCP) is imported in the background after the first paint
+import startup
+from references import format_references
 import logging
 import sys
+import time
+import uuid
 
 logging.basicConfig(
     level=logging.INFO,  # Default to INFO level
@@ -40,8 +44,6 @@ with st.sidebar:
     select_reasoning = st.checkbox('추론 모드 (Claude 4 Sonnet and Claude 3.7 Sonnet)', value=False)
     reasoningMode = 'Enable' if select_reasoning and modelName in ["Claude 4 Sonnet", "Claude 3.7 Sonnet"] else "Disable"
     logger.info(f"reasoningMode: {reasoningMode}")
-
-    chat.update(modelName, reasoningMode)
     
     # Agent selection
     st.markdown("---")
@@ -53,7 +55,8 @@ with st.sidebar:
         "chembl": "🧬 ChEMBL 에이전트 - ChEMBL 데이터베이스에서 화합물, 표적, 생물활성 데이터 검색",
         "uniprot": "🧪 UniProt 에이전트 - UniProt 데이터베이스에서 단백질 정보, 구조, 기능 분석",
         "pdb": "🔬 PDB 에이전트 - PDB 데이터베이스에서 단백질 3D 구조, 품질 지표, 검증 데이터 분석",
-        "multi_agent": "🤖 멀티 에이전트 오케스트레이터 - ChEMBL, UniProt, PDB 에이전트를 통합하여 종합적 분석"
+        "multi_agent": "🤖 멀티 에이전트 오케스트레이터 - ChEMBL, UniProt, PDB 에이전트를 통합하여 종합적 분석",
+        "multi_agent_parallel": "⚡ 병렬 멀티 에이전트 - ChEMBL, UniProt, PDB 에이전트를 동시에 실행하여 빠르게 종합 분석"
     }
     
     # Create selectbox for agent selection
@@ -102,6 +105,11 @@ with st.sidebar:
         - 다중 데이터베이스 교차 참조 분석
         - 종합적 신약 개발 연구 지원
         - 화합물-타겟-구조 통합 분석
+        
+        **⚡ 병렬 멀티 에이전트**:
+        - ChEMBL, UniProt, PDB 에이전트를 동시에 실행
+        - 모든 결과를 한 번에 종합 분석
+        - 응답이 늦은 데이터베이스는 제외하고 부분 결과로 답변
         """)
     
     # Add example questions section
@@ -191,7 +199,7 @@ with st.sidebar:
             - "ATP 결합 부위가 있는 구조를 찾아줘"
             - "약물 결합 부위 정보를 분석해줘"
             """)
-        elif selected_agent == "multi_agent":
+        elif selected_agent in ("multi_agent", "multi_agent_parallel"):
             st.markdown("""
             **멀티 에이전트 오케스트레이터 예시 질문:**
             
@@ -217,12 +225,22 @@ with st.sidebar:
             """)
     
     
+    # answer cache for repeated questions
+    use_answer_cache = st.checkbox('답변 캐시 사용', value=True, help="같은 질문에 저장된 답변을 재사용합니다. 최신 결과가 필요하면 해제하세요.")
+
     clear_button = st.button("대화 초기화", key="clear")
 
+    with st.expander("⏱️ 시작 성능", expanded=False):
+        st.json(startup.get_timings())
+
 st.title('💊 신약 개발 보조 에이전트')  
 
+# Conversation history is kept per browser session
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
 if clear_button is True:
-    chat.initiate()
+    startup.get_chat().initiate(st.session_state.session_id)
 
 # Initialize chat history
 if "messages" not in st.session_state:
@@ -230,100 +248,6 @@ if "messages" not in st.session_state:
     st.session_state.greetings = False
 
 # Display chat messages from history on app rerun
-import re
-
-def extract_and_format_references(content):
-    """웹 검색 결과에서 출처를 추출하고 숫자 링크로 포맷팅"""
-    # URL 패턴 매칭 (다양한 형태의 URL 참조 처리)
-    url_patterns = [
-        r'\[([^\]]+)\]\((https?://[^\)]+)\)',  # [text](url) 형태
-        r'출처:\s*(https?://[^\s]+)',  # 출처: url 형태
-        r'Source:\s*(https?://[^\s]+)',  # Source: url 형태
-        r'참고:\s*(https?://[^\s]+)',  # 참고: url 형태
-        r'Reference:\s*(https?://[^\s]+)',  # Reference: url 형태
-        r'(https?://[^\s]+)',  # 단순 URL 형태
-    ]
-    
-    references = []
-    reference_counter = 1
-    formatted_content = content
-    
-    # URL과 제목을 매칭하여 참고문헌 추출
-    for pattern in url_patterns:
-        matches = re.finditer(pattern, content, re.IGNORECASE)
-        for match in matches:
-            if len(match.groups()) == 2:  # [text](url) 형태
-                title, url = match.groups()
-                if url not in [ref['url'] for ref in references]:
-                    references.append({
-                        'number': reference_counter,
-                        'title': title,
-                        'url': url
-                    })
-                    # 본문에서 해당 부분을 숫자 링크로 교체
-                    formatted_content = formatted_content.replace(
-                        match.group(0), 
-                        f"{title} [{reference_counter}]"
-                    )
-                    reference_counter += 1
-            else:  # 단순 URL 형태
-                url = match.group(1) if len(match.groups()) >= 1 else match.group(0)
-                if url not in [ref['url'] for ref in references]:
-                    # URL에서 도메인명 추출하여 제목으로 사용
-                    domain = re.search(r'https?://(?:www\.)?([^/]+)', url)
-                    title = domain.group(1) if domain else url
-                    references.append({
-                        'number': reference_counter,
-                        'title': title,
-                        'url': url
-                    })
-                    # 본문에서 해당 URL을 숫자 링크로 교체
-                    formatted_content = formatted_content.replace(
-                        url, 
-                        f"[{reference_counter}]"
-                    )
-                    reference_counter += 1
-    
-    return formatted_content, references
-
-def format_references(content):
-    """참고문헌 섹션을 더 읽기 쉽게 포맷팅하고 숫자 링크 추가"""
-    # 먼저 URL 참조를 숫자 링크로 변환
-    formatted_content, references = extract_and_format_references(content)
-    
-    # 기존 참고문헌 섹션 처리
-    if "참고문헌:" in formatted_content or "References:" in formatted_content:
-        lines = formatted_content.split('\n')
-        formatted_lines = []
-        in_references = False
-        
-        for line in lines:
-            if line.strip().startswith("참고문헌:") or line.strip().startswith("References:"):
-                in_references = True
-                formatted_lines.append(f"\n## {line.strip()}\n")
-            elif in_references and line.strip().startswith("["):
-                formatted_lines.append(f"{line.strip()}\n")
-            else:
-                if in_references and line.strip() == "":
-                    formatted_lines.append(line)
-                elif in_references and not line.strip().startswith("[") and line.strip() != "":
-                    in_references = False
-                    formatted_lines.append(line)
-                else:
-                    formatted_lines.append(line)
-        
-        formatted_content = '\n'.join(formatted_lines)
-    
-    # 새로운 참고문헌이 있으면 추가
-    if references:
-        if "참고문헌:" not in formatted_content and "References:" not in formatted_content:
-            formatted_content += "\n\n## 참고문헌\n\n"
-        
-        for ref in references:
-            formatted_content += f"[{ref['number']}] [{ref['title']}]({ref['url']})\n\n"
-    
-    return formatted_content
-
 def display_chat_messages():
     """메시지 기록 출력
     @returns None
@@ -368,8 +292,17 @@ if prompt := st.chat_input("메시지를 입력하세요."):
 
     with st.chat_message("assistant"):
         sessionState = ""
-        response = chat.run_individual_agent(prompt, "Enable", st, selected_agent)
+        start = time.time()
+        chat = startup.get_chat()
+        chat.update(modelName, reasoningMode)
+        response = chat.run_individual_agent(
+            prompt, "Enable", st, selected_agent, st.session_state.session_id, use_cache=use_answer_cache
+        )
+        startup.record_first_response(time.time() - start)
 
     # 참고문헌 포맷팅을 적용한 응답을 세션 상태에 저장
     formatted_response = format_references(response)
     st.session_state.messages.append({"role": "assistant", "content": formatted_response})
+
+# Load chat and start the MCP servers and Bedrock clients once the page is on screen
+startup.start_warmup(modelName, reasoningMode)
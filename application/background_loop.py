@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundEventLoop:
+    """A long-lived asyncio event loop running on a daemon thread
+
+    Coroutines submitted from other threads (e.g. the Streamlit script thread)
+    run on the same loop, so async resources such as HTTP pools, MCP sessions
+    and background tasks can outlive a single turn. Submissions can be keyed;
+    a new submission with the same key cancels the previous one.
+    """
+
+    def __init__(self, name: str = "agent-event-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The event loop, started on first use"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+                logger.info(f"Background event loop started: {self.name}")
+            return self._loop
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def submit(self, coro: Coroutine[Any, Any, Any], key: Optional[str] = None) -> Future:
+        """
+        Schedule a coroutine on the background loop
+
+        Args:
+            coro: Coroutine to run
+            key: Optional key (e.g. session id); a still running coroutine with the same key is cancelled
+
+        Returns:
+            concurrent.futures.Future of the coroutine's result
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if key is not None:
+            with self._lock:
+                previous = self._running.get(key)
+                self._running[key] = future
+            if previous is not None and not previous.done():
+                logger.info(f"Cancelling superseded request: {key}")
+                previous.cancel()
+            future.add_done_callback(lambda f: self._forget(key, f))
+        return future
+
+    def _forget(self, key: str, future: Future):
+        with self._lock:
+            if self._running.get(key) is future:
+                del self._running[key]
+
+    def cancel(self, key: str) -> bool:
+        """Cancel the running coroutine submitted under `key`, if any"""
+        with self._lock:
+            future = self._running.get(key)
+        if future is None or future.done():
+            return False
+        return future.cancel()
+
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the background loop and wait for its result"""
+        return self.submit(coro).result(timeout=timeout)
+
+    def shutdown(self):
+        """Stop the loop; pending coroutines are abandoned"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._thread = None
+        if loop is not None and thread is not None and thread.is_alive():
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
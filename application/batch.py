@@ -0,0 +1,211 @@
+"""
+Headless batch runner
+
+Runs a list of questions from a CSV or JSONL file through any agent type
+without the Streamlit UI and appends one JSON record per finished question
+to an output JSONL file. The output file doubles as the checkpoint: when a
+run is restarted, questions that already have a successful record are
+skipped.
+
+Usage (from the repository root):
+    python application/batch.py questions.csv --agent chembl --output results.jsonl --concurrency 4
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+from typing import Iterable, List, Optional
+
+import chat
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 900  # seconds per question
+
+
+def load_questions(path: str) -> List[dict]:
+    """
+    Read questions from a CSV or JSONL file
+
+    Each row needs a 'question' column/field; optional 'id' and 'agent_type'
+    override the generated id (row number) and the batch's agent type. Unknown
+    agent types are dropped with a warning, so the row runs on the batch's agent.
+
+    Args:
+        path: .csv or .jsonl file
+
+    Returns:
+        List of dictionaries with 'id', 'question' and optionally 'agent_type'
+    """
+    # utf-8-sig strips the byte order mark Excel writes in front of the first header
+    with open(path, encoding="utf-8-sig") as f:
+        if path.endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    questions = []
+    for index, row in enumerate(rows, start=1):
+        question = (row.get("question") or "").strip()
+        if not question:
+            logger.warning(f"Skipping row {index} without a question")
+            continue
+        item = {"id": str(row.get("id") or index), "question": question}
+        if row.get("agent_type") in chat.agent_registry:
+            item["agent_type"] = row["agent_type"]
+        elif row.get("agent_type"):
+            logger.warning(f"Row {index}: unknown agent_type '{row['agent_type']}', using the batch's agent type")
+        questions.append(item)
+    return questions
+
+
+def load_completed(output_path: str) -> set:
+    """Get the ids that already have a successful record in the output file"""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partially written line from a crash
+            if record.get("status") == "success":
+                completed.add(str(record["id"]))
+    return completed
+
+
+async def run_batch_async(
+    questions: Iterable[dict],
+    agent_type: str,
+    output_path: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = DEFAULT_TIMEOUT,
+    use_cache: bool = True,
+) -> dict:
+    """
+    Run questions concurrently and append each result to the output file as it finishes
+
+    Args:
+        questions: Dictionaries with 'id', 'question' and optionally 'agent_type'
+        agent_type: Agent type used for questions that do not name one
+        output_path: JSONL file results are appended to
+        concurrency: Maximum number of questions in flight
+        timeout: Seconds after which a question is abandoned
+        use_cache: Whether to use the answer cache
+
+    Returns:
+        Counts of succeeded, failed and skipped questions
+    """
+    questions = list(questions)
+    completed = load_completed(output_path)
+    pending = [q for q in questions if q["id"] not in completed]
+    # The output file may hold records of questions that are no longer in the input
+    skipped = len(questions) - len(pending)
+    summary = {"success": 0, "error": 0, "timeout": 0, "skipped": skipped}
+    logger.info(f"Batch: {len(pending)} questions to run, {skipped} already done")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    with open(output_path, "a", encoding="utf-8") as out:
+
+        async def run_one(item: dict):
+            async with semaphore:
+                # Every question gets its own session so histories never mix
+                session_id = f"batch-{item['id']}"
+                question_agent = item.get("agent_type", agent_type)
+                start = time.time()
+                record = {"id": item["id"], "agent_type": question_agent, "question": item["question"]}
+                try:
+                    # The deadline reaches the agent's Bedrock and MCP calls, so a timed-out
+                    # question stops spending tokens instead of finishing in the background
+                    response = await chat.run_agent_turn(
+                        item["question"], "Disable", question_agent, session_id, use_cache, timeout=timeout
+                    )
+                    record.update(status="success", response=response)
+                except asyncio.TimeoutError:
+                    record.update(status="timeout", error=f"no answer within {timeout}s")
+                except Exception as e:
+                    logger.error(f"Question {item['id']} failed: {e}")
+                    record.update(status="error", error=str(e))
+                finally:
+                    chat.conversation_store.reset(session_id)
+
+                record["elapsed"] = round(time.time() - start, 2)
+                summary[record["status"]] += 1
+                # Written and flushed from the loop thread, so records never interleave
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                os.fsync(out.fileno())
+                logger.info(f"Question {item['id']}: {record['status']} in {record['elapsed']}s")
+
+        await asyncio.gather(*(run_one(item) for item in pending))
+
+    return summary
+
+
+def run_batch(
+    input_path: str,
+    agent_type: str,
+    output_path: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = DEFAULT_TIMEOUT,
+    use_cache: bool = True,
+    model_name: Optional[str] = None,
+    reasoning_mode: str = "Disable",
+) -> dict:
+    """
+    Run a question file through an agent (Python API)
+
+    Args:
+        input_path: CSV or JSONL file with questions
+        agent_type: Agent type ('web_search', 'chembl', 'uniprot', 'pdb', 'multi_agent', 'multi_agent_parallel')
+        output_path: JSONL file results are appended to; also used to resume
+        concurrency: Maximum number of questions in flight
+        timeout: Seconds after which a question is abandoned
+        use_cache: Whether to use the answer cache
+        model_name: Model name from info.py (default: the current chat model)
+        reasoning_mode: 'Enable' or 'Disable'
+
+    Returns:
+        Counts of succeeded, failed and skipped questions
+    """
+    chat.update(model_name or chat.model_name, reasoning_mode)
+    questions = load_questions(input_path)
+    return chat.agent_event_loop.run(
+        run_batch_async(questions, agent_type, output_path, concurrency, timeout, use_cache)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a list of questions through an agent without the UI")
+    parser.add_argument("input", help="CSV or JSONL file with a 'question' column")
+    parser.add_argument("--agent", default="web_search", choices=list(chat.agent_registry), help="agent type")
+    parser.add_argument("--output", default="results.jsonl", help="JSONL output (and checkpoint) file")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="questions in flight")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds per question")
+    parser.add_argument("--model", default=None, help="model name, e.g. 'Claude 4 Sonnet'")
+    parser.add_argument("--reasoning", action="store_true", help="enable reasoning mode")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the answer cache")
+    args = parser.parse_args()
+
+    summary = run_batch(
+        args.input,
+        args.agent,
+        args.output,
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        use_cache=not args.no_cache,
+        model_name=args.model,
+        reasoning_mode="Enable" if args.reasoning else "Disable",
+    )
+    print(json.dumps(summary, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from botocore.config import Config
+from botocore.exceptions import ClientError, ConnectTimeoutError, EndpointConnectionError, ReadTimeoutError
+from strands.models import BedrockModel
+from strands.types.exceptions import ModelThrottledException
+
+import deadlines
+import tracing
+from deadlines import RequestAbandoned
+
+logger = logging.getLogger(__name__)
+
+ROUTING_POLICY = os.getenv("BEDROCK_ROUTING_POLICY", "least_latency")  # or 'round_robin'
+CONNECT_TIMEOUT = float(os.getenv("BEDROCK_CONNECT_TIMEOUT", "10"))  # seconds, so an unreachable region fails over quickly
+THROTTLE_COOLDOWN = float(os.getenv("BEDROCK_THROTTLE_COOLDOWN", "30"))  # seconds a throttled region is deprioritized
+LATENCY_SMOOTHING = 0.3  # weight of the newest sample in the moving average
+
+# Error codes worth retrying in another region
+FAILOVER_ERROR_CODES = {
+    "ThrottlingException",
+    "ServiceUnavailableException",
+    "InternalServerException",
+    "ModelNotReadyException",
+}
+
+
+def classify_failure(error: Exception) -> Optional[str]:
+    """
+    Classify a Bedrock error for routing purposes
+
+    Returns:
+        'throttle', 'timeout' or 'unavailable' if another region may succeed, None otherwise
+    """
+    if isinstance(error, ModelThrottledException):
+        return "throttle"
+    if isinstance(error, (ReadTimeoutError, ConnectTimeoutError, EndpointConnectionError)):
+        return "timeout"
+    if isinstance(error, ClientError) and error.response.get("Error", {}).get("Code") in FAILOVER_ERROR_CODES:
+        return "unavailable"
+    return None
+
+
+def record_stream_usage(span, metadata: dict):
+    """Copy the token usage of a stream's metadata event onto a span"""
+    usage = metadata.get("usage", {})
+    span.set_attributes(
+        {
+            f"tokens.{name}": usage[key]
+            for key, name in (
+                ("inputTokens", "input"),
+                ("outputTokens", "output"),
+                ("cacheReadInputTokens", "cache_read"),
+                ("cacheWriteInputTokens", "cache_write"),
+            )
+            if key in usage
+        }
+    )
+
+
+class RegionStats:
+    """Recent latency and failure counters of one Bedrock region"""
+
+    def __init__(self, region: str):
+        self.region = region
+        self.latency = None  # moving average of the time to the first stream event, seconds
+        self.in_flight = 0
+        self.last_throttle = 0.0
+        self.counters = {"requests": 0, "successes": 0, "throttles": 0, "timeouts": 0, "unavailable": 0, "errors": 0}
+
+    def record_latency(self, seconds: float):
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency = LATENCY_SMOOTHING * seconds + (1 - LATENCY_SMOOTHING) * self.latency
+
+    def record_failure(self, kind: Optional[str]):
+        if kind == "throttle":
+            self.counters["throttles"] += 1
+            self.last_throttle = time.monotonic()
+        elif kind == "timeout":
+            self.counters["timeouts"] += 1
+            self.last_throttle = time.monotonic()
+        elif kind == "unavailable":
+            self.counters["unavailable"] += 1
+            self.last_throttle = time.monotonic()
+        else:
+            self.counters["errors"] += 1
+
+    def is_cooling_down(self) -> bool:
+        return time.monotonic() - self.last_throttle < THROTTLE_COOLDOWN
+
+    def score(self) -> float:
+        # Regions without a sample yet score 0 so they get tried; busy regions score higher
+        return (self.latency or 0.0) * (1 + self.in_flight)
+
+    def to_dict(self) -> dict:
+        return {
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "in_flight": self.in_flight,
+            "cooling_down": self.is_cooling_down(),
+            **self.counters,
+        }
+
+
+# PromptCacheStats counter -> key of the Converse stream usage
+USAGE_COUNTERS = {
+    "input_tokens": "inputTokens",
+    "output_tokens": "outputTokens",
+    "cache_read_tokens": "cacheReadInputTokens",
+    "cache_write_tokens": "cacheWriteInputTokens",
+}
+
+
+class PromptCacheStats:
+    """Token usage and prompt cache reads/writes, grouped by agent"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._usage: Dict[str, Dict[str, int]] = {}
+
+    def record(self, name: str, usage: dict):
+        """
+        Add the usage of one model call
+
+        Args:
+            name: Agent the call was made for
+            usage: 'usage' of a Converse stream metadata event
+        """
+        with self._lock:
+            counters = self._usage.setdefault(name, {"requests": 0, **{counter: 0 for counter in USAGE_COUNTERS}})
+            counters["requests"] += 1
+            for counter, key in USAGE_COUNTERS.items():
+                counters[counter] += usage.get(key, 0)
+
+    def get_stats(self) -> dict:
+        """Get the counters per agent with the share of prompt tokens read from the cache"""
+        with self._lock:
+            stats = {}
+            for name, counters in self._usage.items():
+                # inputTokens only counts the uncached part of the prompt
+                prompt_tokens = (
+                    counters["input_tokens"] + counters["cache_read_tokens"] + counters["cache_write_tokens"]
+                )
+                hit_rate = counters["cache_read_tokens"] / prompt_tokens if prompt_tokens else 0.0
+                stats[name] = {**counters, "cache_hit_rate": round(hit_rate, 3)}
+            return stats
+
+
+class RegionRoutedBedrockModel(BedrockModel):
+    """BedrockModel that spreads requests over the regions of an `info.py` model profile list
+
+    Every region gets its own bedrock-runtime client. Requests go to the
+    region with the lowest recent latency (or round-robin), regions that
+    recently throttled or timed out are tried last, and a request that fails
+    with throttling, a timeout or an unavailable service before the first
+    stream event is retried in the next region. Once output has been
+    streamed, errors are raised as usual.
+    """
+
+    def __init__(
+        self,
+        profiles: List[dict],
+        boto_client_config: Optional[Config] = None,
+        policy: str = ROUTING_POLICY,
+        usage_listener: Optional[Callable[[dict], None]] = None,
+        **model_config: Any,
+    ):
+        """
+        Args:
+            profiles: Model profiles from info.get_model_info() ('bedrock_region', 'model_id')
+            boto_client_config: Shared botocore config; retries are limited to one attempt per region
+            policy: 'least_latency' or 'round_robin'
+            usage_listener: Called with the token usage of every finished stream (including prompt cache tokens)
+            **model_config: BedrockModel configuration (model_id defaults to the first profile's)
+        """
+        model_config.setdefault("model_id", profiles[0]["model_id"])
+        client_config = (boto_client_config or Config()).merge(
+            Config(connect_timeout=CONNECT_TIMEOUT, retries={"total_max_attempts": 1, "mode": "standard"})
+        )
+        self.region_models: Dict[str, BedrockModel] = {}
+        super().__init__(boto_client_config=client_config, region_name=profiles[0]["bedrock_region"], **model_config)
+
+        for profile in profiles:
+            region = profile["bedrock_region"]
+            if region in self.region_models:
+                continue
+            self.region_models[region] = BedrockModel(
+                boto_client_config=client_config,
+                region_name=region,
+                **{**model_config, "model_id": profile["model_id"]},
+            )
+        self.policy = policy
+        self.usage_listener = usage_listener
+        self._stats = {region: RegionStats(region) for region in self.region_models}
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def update_config(self, **model_config: Any) -> None:
+        super().update_config(**model_config)
+        for model in getattr(self, "region_models", {}).values():
+            model.update_config(**{k: v for k, v in model_config.items() if k != "model_id"})
+
+    def select_regions(self) -> List[str]:
+        """Order the regions for the next request: healthy regions by policy, cooling-down regions last"""
+        with self._lock:
+            regions = list(self.region_models)
+            if self.policy == "round_robin":
+                offset = self._next % len(regions)
+                self._next += 1
+                regions = regions[offset:] + regions[:offset]
+            else:
+                regions.sort(key=lambda region: self._stats[region].score())
+            return sorted(regions, key=lambda region: self._stats[region].is_cooling_down())
+
+    def stream(self, request: dict[str, Any]) -> Iterable[dict[str, Any]]:
+        # Ended explicitly: the span has to stay open across the yields to the agent
+        span = tracing.start_span("bedrock.converse_stream", model_id=self.config.get("model_id"))
+        deadline = deadlines.current()
+        failovers = 0
+        last_error = None
+        try:
+            for region in self.select_regions():
+                if deadline is not None:
+                    deadline.check("bedrock")  # do not start (or fail over) a request nobody waits for
+                model = self.region_models[region]
+                stats = self._stats[region]
+                with self._lock:
+                    stats.in_flight += 1
+                    stats.counters["requests"] += 1
+                start = time.monotonic()
+                started = False
+                stream = model.stream({**request, "modelId": model.config["model_id"]})
+                try:
+                    for chunk in stream:
+                        if deadline is not None:
+                            deadline.check("bedrock")  # stop reading and release the connection
+                        if not started:
+                            started = True
+                            ttft = time.monotonic() - start
+                            with self._lock:
+                                stats.record_latency(ttft)
+                            span.set_attributes(
+                                {"region": region, "failovers": failovers, "ttft_ms": round(ttft * 1000, 1)}
+                            )
+                        if "metadata" in chunk:
+                            record_stream_usage(span, chunk["metadata"])
+                            if self.usage_listener is not None:
+                                self.usage_listener(chunk["metadata"].get("usage", {}))
+                        yield chunk
+                    with self._lock:
+                        stats.counters["successes"] += 1
+                    return
+                except RequestAbandoned:
+                    raise
+                except Exception as e:
+                    kind = classify_failure(e)
+                    with self._lock:
+                        stats.record_failure(kind)
+                    if started or kind is None:
+                        raise
+                    logger.warning(f"Bedrock region {region} failed ({kind}), failing over: {e}")
+                    last_error = e
+                    failovers += 1
+                finally:
+                    stream.close()
+                    with self._lock:
+                        stats.in_flight -= 1
+
+            # Every region refused the request; let the agent's throttling backoff retry it
+            raise ModelThrottledException(f"All Bedrock regions failed: {last_error}") from last_error
+        except Exception as e:
+            span.record_exception(e)
+            raise
+        finally:
+            span.end()
+
+    def get_stats(self) -> dict:
+        """Get per-region latency, in-flight and failure counters"""
+        with self._lock:
+            return {region: stats.to_dict() for region, stats in self._stats.items()}
@@ -0,0 +1,381 @@
+"""
+Offline component benchmark
+
+Measures the main phases of an agent turn without Bedrock or network access:
+MCP servers are replaced by benchmark_stub_server.py (serving the recorded tool
+catalogs of the real servers) and the model by a scripted fake that requests
+one tool call and then streams a canned answer. Tool catalogs, agent
+construction and agent turns go through chat's client pool, session manager
+and agent builders, so tool routing and the tool caches are part of the numbers.
+
+Usage (from the repository root):
+    python application/benchmark.py --iterations 10 --output bench.json
+    python application/benchmark.py --baseline bench.json   # exit code 1 on regressions
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Iterable, List, Optional
+
+from mcp import StdioServerParameters, stdio_client
+from strands.handlers import null_callback_handler
+from strands.tools.mcp import MCPClient
+from strands.types.models import Model
+
+from references import format_references
+from streaming import StreamingRenderer
+
+logger = logging.getLogger(__name__)
+
+STUB_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_stub_server.py")
+SERVERS = ("tavily", "chembl", "uniprot", "pdb")
+# chat agent builder and a typical question per server
+AGENT_BUILDERS = {
+    "tavily": ("web_search_agent", "EGFR 억제제 최신 임상 뉴스"),
+    "chembl": ("chembl_agent", "아스피린(CHEMBL25)의 생물활성과 타겟"),
+    "uniprot": ("uniprot_agent", "EGFR 단백질의 서열과 기능 도메인"),
+    "pdb": ("pdb_agent", "EGFR 키나아제 도메인의 결정 구조와 리간드"),
+}
+DEFAULT_ITERATIONS = 5
+REGRESSION_THRESHOLD = 0.2  # relative slowdown of the median reported as a regression
+
+SAMPLE_ANSWER = "\n\n".join(
+    f"## 결과 {i}\n아스피린(CHEMBL25)은 COX-1/COX-2를 억제합니다. "
+    f"출처: https://www.ebi.ac.uk/chembl/compound/{i} 및 [RCSB PDB](https://www.rcsb.org/structure/{i}HHO) 참고."
+    for i in range(40)
+)
+
+
+class ScriptedModel(Model):
+    """Fake model emitting Bedrock-style stream events
+
+    When tools are available and the last message is not a tool result, it
+    requests `tool_name` (the first tool offered if None); otherwise it streams
+    `answer` in small chunks.
+    """
+
+    def __init__(self, tool_name: Optional[str], answer: str = SAMPLE_ANSWER, chunk_size: int = 8):
+        self.tool_name = tool_name
+        self.answer = answer
+        self.chunk_size = chunk_size
+        self.config = {"model_id": "scripted"}
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> Any:
+        return self.config
+
+    def format_request(self, messages, tool_specs=None, system_prompt=None) -> dict:
+        return {"messages": messages, "tool_specs": tool_specs or []}
+
+    def format_chunk(self, event: Any) -> Any:
+        return event
+
+    def stream(self, request: dict) -> Iterable[dict]:
+        last = request["messages"][-1]
+        wants_tool = request["tool_specs"] and not any("toolResult" in block for block in last["content"])
+        yield {"messageStart": {"role": "assistant"}}
+        if wants_tool:
+            name = self.tool_name or request["tool_specs"][0]["name"]
+            tool_use = {"toolUseId": uuid.uuid4().hex, "name": name}
+            yield {"contentBlockStart": {"start": {"toolUse": tool_use}}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps({"id": "CHEMBL25"})}}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "tool_use"}}
+        else:
+            for i in range(0, len(self.answer), self.chunk_size):
+                yield {"contentBlockDelta": {"delta": {"text": self.answer[i : i + self.chunk_size]}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+        usage = {"inputTokens": 0, "outputTokens": 0, "totalTokens": 0}
+        yield {"metadata": {"usage": usage, "metrics": {"latencyMs": 0}}}
+
+
+class CopyingPlaceholder:
+    """Stand-in for st.empty(); copies the markdown like a re-render would"""
+
+    def __init__(self):
+        self.renders = 0
+        self.rendered_bytes = 0
+
+    def markdown(self, text: str):
+        self.renders += 1
+        self.rendered_bytes += len(text.encode("utf-8"))
+
+
+def stub_client(server: str) -> MCPClient:
+    # stdio_client does not inherit the environment, so pass the stub's settings on
+    env = {**os.environ, "PYTHONWARNINGS": "ignore"}
+    params = StdioServerParameters(command=sys.executable, args=[STUB_SERVER, server], env=env)
+    return MCPClient(lambda: stdio_client(params))
+
+
+def measure(fn: Callable[[], Any], iterations: int) -> List[float]:
+    """Run `fn` `iterations` times and return the durations in seconds"""
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def summarize(durations: List[float], **extra: Any) -> dict:
+    """Milliseconds statistics of a list of durations"""
+    ms = sorted(d * 1000 for d in durations)
+    return {
+        "iterations": len(ms),
+        "min_ms": round(ms[0], 3),
+        "median_ms": round(statistics.median(ms), 3),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+        "mean_ms": round(statistics.mean(ms), 3),
+        "max_ms": round(ms[-1], 3),
+        **extra,
+    }
+
+
+def bench_mcp_spawn(iterations: int, servers: Iterable[str]) -> dict:
+    """MCP process spawn and handshake, the cost the client pool keeps off the request path"""
+    phases = {}
+    for server in servers:
+        clients = []
+
+        def spawn():
+            client = stub_client(server)
+            client.start()
+            clients.append(client)
+
+        try:
+            phases[f"mcp_spawn_handshake.{server}"] = summarize(measure(spawn, iterations))
+        finally:
+            for client in clients:
+                client.stop(None, None, None)
+    return phases
+
+
+def use_stub_servers(chat, servers: Iterable[str]):
+    """Point chat's client pool at the stub servers and its agent builders at the scripted model"""
+    for server in servers:
+        chat.mcp_client_pool.register(server, lambda server=server: stub_client(server), size=1)
+        chat.mcp_client_pool.get_server(server).add_restart_listener(chat._session_manager.invalidate_tools)
+    chat._session_manager.invalidate_tools()
+    chat.get_model = lambda: ScriptedModel(None)
+
+
+def bench_agents(iterations: int, servers: Iterable[str]) -> dict:
+    """Tool catalog lookups, agent construction, tool round trips and full agent turns through chat's builders"""
+    import chat
+
+    servers = list(servers)
+    use_stub_servers(chat, servers)
+    manager = chat._session_manager
+    phases = {}
+    try:
+        for server in servers:
+            builder_name, query = AGENT_BUILDERS[server]
+            build_agent = getattr(chat, builder_name)
+
+            def builder(query, history_mode):
+                agent = build_agent(query, history_mode=history_mode)
+                agent.callback_handler = null_callback_handler  # the default handler prints the answer to stdout
+                return agent
+
+            def cold_catalog():
+                manager.invalidate_tools(server)
+                manager.get_tools(server)
+
+            catalog = manager.get_tools(server)  # starts the pooled session
+            phases[f"tool_catalog_cold.{server}"] = summarize(measure(cold_catalog, iterations), tools=len(catalog))
+            phases[f"tool_catalog_warm.{server}"] = summarize(measure(lambda: manager.get_tools(server), iterations))
+
+            agents = []
+            phases[f"agent_construction.{server}"] = summarize(
+                measure(lambda: agents.append(builder(query, history_mode="Disable")), iterations)
+            )
+            agent = agents[-1]
+            specs = list(agent.tool_registry.get_all_tools_config().values())
+            phases[f"agent_construction.{server}"].update(
+                catalog_tools=len(catalog),
+                routed_tools=len(specs),
+                catalog_spec_bytes=len(json.dumps([tool.tool_spec for tool in catalog])),
+                routed_spec_bytes=len(json.dumps(specs)),
+            )
+
+            # The pooled stub session on its own, without an agent or the tool result cache
+            client = chat.mcp_client_pool.get(server)
+            tool_name = catalog[0].tool_name
+
+            def round_trip():
+                result = client.call_tool_sync(uuid.uuid4().hex, tool_name, {"id": "CHEMBL25"})
+                if result["status"] != "success":
+                    raise RuntimeError(f"{server} tool '{tool_name}' failed: {result['content']}")
+
+            phases[f"tool_round_trip.{server}"] = summarize(measure(round_trip, iterations), tool=tool_name)
+
+            def turn():
+                agent = builder(query, history_mode="Disable")
+                agent(query)
+                # Guards against timing a turn that never reaches the MCP server or the tool cache
+                if not any("toolUse" in block for message in agent.messages for block in message["content"]):
+                    raise RuntimeError(f"Scripted {server} turn made no tool call")
+
+            def uncached_turn():
+                manager.tool_cache.clear(server)
+                turn()
+
+            phases[f"agent_turn_uncached.{server}"] = summarize(measure(uncached_turn, iterations))
+            hits = manager.tool_cache.get_stats()["hits"]
+            phases[f"agent_turn_cached.{server}"] = summarize(
+                measure(turn, iterations), cache_hits=manager.tool_cache.get_stats()["hits"] - hits
+            )
+    finally:
+        chat.mcp_client_pool.shutdown()
+    return phases
+
+
+def bench_streaming_render(iterations: int, chunk_size: int = 8) -> dict:
+    """Feed a streamed answer through StreamingRenderer and through a naive re-render per chunk"""
+    chunks = [SAMPLE_ANSWER[i : i + chunk_size] for i in range(0, len(SAMPLE_ANSWER), chunk_size)]
+    phases = {}
+    placeholders = []
+
+    def coalesced():
+        placeholder = CopyingPlaceholder()
+        renderer = StreamingRenderer(placeholder)
+        for chunk in chunks:
+            renderer.write(chunk)
+        renderer.close()
+        placeholders.append(placeholder)
+
+    phases["streaming_render.coalesced"] = summarize(
+        measure(coalesced, iterations),
+        renders=placeholders[-1].renders,
+        rendered_bytes=placeholders[-1].rendered_bytes,
+    )
+
+    def naive():
+        placeholder = CopyingPlaceholder()
+        text = ""
+        for chunk in chunks:
+            text += chunk
+            placeholder.markdown(text)
+        placeholders.append(placeholder)
+
+    phases["streaming_render.naive"] = summarize(
+        measure(naive, iterations),
+        renders=placeholders[-1].renders,
+        rendered_bytes=placeholders[-1].rendered_bytes,
+    )
+    return phases
+
+
+def bench_format_references(iterations: int) -> dict:
+    return {"format_references": summarize(measure(lambda: format_references(SAMPLE_ANSWER), iterations))}
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(STUB_SERVER),
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except Exception:
+        return None
+
+
+def run_benchmarks(iterations: int = DEFAULT_ITERATIONS, servers: Iterable[str] = SERVERS) -> dict:
+    """
+    Run every benchmark phase
+
+    Args:
+        iterations: Repetitions per phase
+        servers: Stub MCP servers to benchmark
+
+    Returns:
+        Dictionary with run metadata and per-phase timing statistics
+    """
+    phases = {}
+    phases.update(bench_mcp_spawn(iterations, servers))
+    phases.update(bench_agents(iterations, servers))
+    phases.update(bench_streaming_render(iterations))
+    phases.update(bench_format_references(iterations))
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "payload_bytes": int(os.getenv("STUB_PAYLOAD_BYTES", "4000")),
+        },
+        "phases": phases,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD) -> List[dict]:
+    """List the phases whose median got slower than the baseline by more than `threshold`"""
+    regressions = []
+    for name, stats in results["phases"].items():
+        before = baseline.get("phases", {}).get(name)
+        if not before or not before["median_ms"]:
+            continue
+        ratio = stats["median_ms"] / before["median_ms"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                {
+                    "phase": name,
+                    "baseline_ms": before["median_ms"],
+                    "median_ms": stats["median_ms"],
+                    "ratio": round(ratio, 2),
+                }
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of MCP, agent, streaming and formatting phases")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="repetitions per phase")
+    parser.add_argument("--servers", nargs="*", default=list(SERVERS), choices=SERVERS, help="stub servers to use")
+    parser.add_argument("--payload-bytes", type=int, default=None, help="size of each canned tool result")
+    parser.add_argument("--output", default=None, help="JSON output file (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="previous JSON output to compare medians against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    if args.payload_bytes is not None:
+        os.environ["STUB_PAYLOAD_BYTES"] = str(args.payload_bytes)
+
+    results = run_benchmarks(args.iterations, args.servers)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            results["regressions"] = compare(results, json.load(f), args.threshold)
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if results.get("regressions"):
+        for regression in results["regressions"]:
+            logger.warning(
+                f"Regression in {regression['phase']}: {regression['baseline_ms']}ms -> {regression['median_ms']}ms"
+            )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
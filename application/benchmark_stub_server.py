@@ -0,0 +1,166 @@
+"""
+Offline stand-in for the Tavily/ChEMBL/UniProt/PDB MCP servers
+
+Speaks stdio MCP and serves the tool catalog recorded from the real server
+(names, descriptions and input schemas, from benchmark_catalogs.json), but
+every tool returns a canned payload without touching the network. Used by
+benchmark.py.
+
+Usage:
+    python application/benchmark_stub_server.py chembl
+    python application/benchmark_stub_server.py --dump-catalogs   # re-record the catalogs from the real servers
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+import mcp.types as types
+from mcp.server.lowlevel import Server
+from mcp.server.stdio import stdio_server
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.WARNING, handlers=[logging.StreamHandler(sys.stderr)])
+
+APPLICATION_DIR = os.path.dirname(os.path.abspath(__file__))
+CATALOG_PATH = os.path.join(APPLICATION_DIR, "benchmark_catalogs.json")
+PAYLOAD_BYTES = int(os.getenv("STUB_PAYLOAD_BYTES", "4000"))  # size of each canned tool result
+TOOL_LATENCY = float(os.getenv("STUB_TOOL_LATENCY", "0"))  # seconds of simulated upstream latency
+
+# The real servers, started the same way chat.py registers them (paths relative to the repository root)
+REAL_SERVERS = {
+    "tavily": (sys.executable, ["application/mcp_server_tavily.py"]),
+    "chembl": ("node", ["application/ChEMBL-MCP-Server/build/index.js"]),
+    "uniprot": ("node", ["application/UniProt-MCP-Server/build/index.js"]),
+    "pdb": ("node", ["application/PDB-MCP-Server/build/index.js"]),
+}
+
+# Tool names used for servers missing from the recorded catalogs (generic query/id schema)
+FALLBACK_TOOL_NAMES = {
+    "tavily": ["tavily_web_search", "tavily_answer_search", "tavily_news_search"],
+    "chembl": ["search_compounds", "get_compound_info", "search_targets", "get_target_info"],
+    "uniprot": ["search_proteins", "get_protein_info", "search_by_gene", "get_protein_sequence"],
+    "pdb": ["search_structures", "get_structure_info", "download_structure", "search_by_uniprot"],
+}
+FALLBACK_SCHEMA = {
+    "type": "object",
+    "properties": {"query": {"type": "string"}, "id": {"type": "string"}},
+}
+
+
+def load_catalog(server: str) -> list:
+    """Recorded tool definitions of a server, or generic stand-ins if it was never recorded"""
+    if os.path.exists(CATALOG_PATH):
+        with open(CATALOG_PATH, encoding="utf-8") as f:
+            catalogs = json.load(f)
+        if catalogs.get(server):
+            return catalogs[server]
+    logger.warning(f"No recorded catalog for {server}; run --dump-catalogs with the real server available")
+    return [
+        {"name": name, "description": f"Stub of {server} '{name}'", "inputSchema": FALLBACK_SCHEMA}
+        for name in FALLBACK_TOOL_NAMES[server]
+    ]
+
+
+def canned_payload(server: str, tool_name: str, arguments: dict) -> str:
+    """Build a deterministic JSON payload of roughly PAYLOAD_BYTES"""
+    record = {
+        "server": server,
+        "tool": tool_name,
+        "arguments": arguments,
+        "url": f"https://example.org/{server}/{tool_name}",
+    }
+    filler = "lorem ipsum dolor sit amet " * (PAYLOAD_BYTES // 27 + 1)
+    record["results"] = [{"id": f"{server.upper()}{i}", "description": filler[: PAYLOAD_BYTES // 5]} for i in range(5)]
+    return json.dumps(record)
+
+
+def build_server(server: str) -> Server:
+    catalog = load_catalog(server)
+    tools = [types.Tool(**tool) for tool in catalog]
+    stub = Server(f"{server}_stub")
+
+    @stub.list_tools()
+    async def list_tools() -> list:
+        return tools
+
+    @stub.call_tool()
+    async def call_tool(name: str, arguments: dict) -> list:
+        if TOOL_LATENCY:
+            await asyncio.sleep(TOOL_LATENCY)
+        return [types.TextContent(type="text", text=canned_payload(server, name, arguments or {}))]
+
+    return stub
+
+
+async def serve(server: str):
+    stub = build_server(server)
+    async with stdio_server() as (read_stream, write_stream):
+        await stub.run(read_stream, write_stream, stub.create_initialization_options())
+
+
+def dump_catalogs(servers: list, path: str = CATALOG_PATH) -> dict:
+    """
+    Record the tool catalogs of the real servers
+
+    Servers that cannot be started keep their previously recorded catalog.
+
+    Args:
+        servers: Server names of REAL_SERVERS to record
+        path: JSON file the catalogs are written to
+
+    Returns:
+        Number of tools recorded per server
+    """
+    from mcp import StdioServerParameters, stdio_client
+    from strands.tools.mcp import MCPClient
+
+    catalogs = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            catalogs = json.load(f)
+
+    repository_root = os.path.dirname(APPLICATION_DIR)
+    # Listing tools needs no credentials; the Tavily server only checks that a key is set
+    env = {**os.environ, "TAVILY_API_KEY": os.getenv("TAVILY_API_KEY") or "catalog-dump"}
+    recorded = {}
+    for server in servers:
+        command, args = REAL_SERVERS[server]
+        params = StdioServerParameters(command=command, args=args, env=env, cwd=repository_root)
+        client = MCPClient(lambda: stdio_client(params))
+        try:
+            client.start()
+            try:
+                tools = client.list_tools_sync()
+            finally:
+                client.stop(None, None, None)
+        except Exception as e:
+            logger.error(f"Could not record the {server} catalog: {e}")
+            continue
+        catalogs[server] = [
+            {
+                "name": tool.mcp_tool.name,
+                "description": tool.mcp_tool.description or "",
+                "inputSchema": tool.mcp_tool.inputSchema,
+            }
+            for tool in tools
+        ]
+        recorded[server] = len(tools)
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(catalogs, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+    return recorded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline stub of an MCP server")
+    parser.add_argument("server", nargs="?", default="chembl", choices=list(REAL_SERVERS))
+    parser.add_argument("--dump-catalogs", nargs="*", choices=list(REAL_SERVERS), help="record catalogs and exit")
+    args = parser.parse_args()
+    if args.dump_catalogs is not None:
+        print(json.dumps(dump_catalogs(args.dump_catalogs or list(REAL_SERVERS))))
+    else:
+        asyncio.run(serve(args.server))
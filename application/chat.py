@@ -4,15 +4,32 @@ import asyncio
 import logging
 import traceback
 import os
-import uuid
+import atexit
+import threading
+import time
+import contextvars
+import queue
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
 
 from botocore.config import Config
 from strands import Agent, tool
-from strands.models import BedrockModel
-from strands.agent.conversation_manager import SlidingWindowConversationManager
-from strands.tools.mcp import MCPClient
+from strands.tools.mcp import MCPClient, MCPAgentTool
 from mcp import stdio_client, StdioServerParameters
+from mcp_pool import MCPClientPool, watch_tools_list_changed
+from streaming import StreamingRenderer
+from conversation_store import ConversationStore, TokenBudgetConversationManager
+from background_loop import BackgroundEventLoop
+from answer_cache import AnswerCache
+from tool_cache import ToolResultCache, CachingMCPAgentTool
+from tool_router import select_tools
+from prefetch import Prefetcher
+from bedrock_router import RegionRoutedBedrockModel, PromptCacheStats
+import model_router
+from model_router import RoleStats
+import tracing
+import deadlines
+from deadlines import RequestAbandoned
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,37 +43,140 @@ models = info.get_model_info(model_name)
 reasoning_mode = 'Disable'
 
 def update(modelName, reasoningMode):    
-    global model_name, model_id, model_type, reasoning_mode
+    global model_name, model_id, model_type, models, reasoning_mode
     
     if model_name != modelName:
         model_name = modelName
         logger.info(f"model_name: {model_name}")
         
+        models = info.get_model_info(model_name)
         model_id = models[0]["model_id"]
         model_type = models[0]["model_type"]
+        invalidate_model_cache()
 
     if reasoningMode != reasoning_mode:
         reasoning_mode = reasoningMode
         logger.info(f"reasoning_mode: {reasoning_mode}")
+        invalidate_model_cache()
 
-def initiate():
-    global userId, conversation_manager    
-    userId = uuid.uuid4().hex
-    # Reset conversation manager to clear history
-    conversation_manager = SlidingWindowConversationManager(window_size=5)
-    logger.info(f"userId: {userId}, conversation manager reset")
+def initiate(session_id):
+    # Clear this session's history only; other sessions are untouched
+    conversation_store.reset(session_id)
+    logger.info(f"session_id: {session_id}, conversation history reset")
 
 #########################################################
 # Strands Agent Model Configuration
 #########################################################
+# Shared botocore config; the retry and timeout policy is the same for every model.
+# The read timeout bounds a stalled stream; the request deadline (REQUEST_TIMEOUT)
+# bounds the turn as a whole.
+boto_client_config = Config(
+    read_timeout=float(os.getenv("BEDROCK_READ_TIMEOUT", "300")),
+    connect_timeout=float(os.getenv("BEDROCK_CONNECT_TIMEOUT", "10")),
+    retries=dict(max_attempts=3, mode="adaptive"),
+)
+
+# Region-routed BedrockModel instances keyed by (model_id, regions, reasoning_mode, max_tokens, cache points).
+# Each one owns a bedrock-runtime client per region, so reusing it keeps the HTTPS
+# connection pools and TLS sessions alive across turns and agents.
+_model_cache = {}
+_model_cache_lock = threading.Lock()
+
+def invalidate_model_cache():
+    """Drop cached BedrockModel instances, e.g. after the model settings changed"""
+    with _model_cache_lock:
+        _model_cache.clear()
+    logger.info("model cache cleared")
+
+# Bedrock prompt caching: a cache checkpoint after the tool definitions and one after
+# the system prompt let repeated agent calls read that static prefix from the cache.
+# Nova models cache the system prompt but not tool definitions.
+PROMPT_CACHING = os.getenv("BEDROCK_PROMPT_CACHING", "Enable")
+PROMPT_CACHE_MODELS = {
+    "claude-3-7-sonnet": ("system", "tools"),
+    "claude-3-5-haiku": ("system", "tools"),
+    "claude-sonnet-4": ("system", "tools"),
+    "claude-opus-4": ("system", "tools"),
+    "nova-micro": ("system",),
+    "nova-lite": ("system",),
+    "nova-pro": ("system",),
+}
+
+# Agent the model calls of the current thread are made for, used to attribute token usage
+current_agent_name = contextvars.ContextVar("current_agent_name", default="agent")
+prompt_cache_stats = PromptCacheStats()
+
+def get_prompt_cache_config(model_id: str) -> dict:
+    """Get the BedrockModel cache checkpoint settings supported by a model"""
+    if PROMPT_CACHING != "Enable":
+        return {}
+    for name, prefixes in PROMPT_CACHE_MODELS.items():
+        if name in model_id:
+            config = {"cache_prompt": "default"}
+            if "tools" in prefixes:
+                config["cache_tools"] = "default"
+            return config
+    return {}
+
+def record_model_usage(usage: dict):
+    name = current_agent_name.get()
+    prompt_cache_stats.record(name, usage)
+    if usage.get("cacheReadInputTokens") or usage.get("cacheWriteInputTokens"):
+        logger.info(
+            f"prompt cache ({name}): read {usage.get('cacheReadInputTokens', 0)}, "
+            f"write {usage.get('cacheWriteInputTokens', 0)}, uncached {usage.get('inputTokens', 0)} tokens"
+        )
+
+def get_prompt_cache_stats() -> dict:
+    """Get token usage and prompt cache hits per agent"""
+    return prompt_cache_stats.get_stats()
+
+def get_region_stats() -> dict:
+    """Get per-region Bedrock routing stats of every cached model"""
+    with _model_cache_lock:
+        return {str(key): model.get_stats() for key, model in _model_cache.items()}
+
+# Model the routing policy picked for the agent being built in this context (None: sidebar model)
+routed_model_name = contextvars.ContextVar("routed_model_name", default=None)
+role_stats = RoleStats()
+
+def current_model_name() -> str:
+    return routed_model_name.get() or model_name
+
+def agent_role(agent_type: str) -> str:
+    """Routing policy role of an agent type: the multi-agent entry points are the orchestrator"""
+    return "orchestrator" if agent_type in ("multi_agent", "multi_agent_parallel") else agent_type
+
+def get_role_stats() -> dict:
+    """Get latency, token and escalation counters per agent role and model"""
+    return role_stats.get_stats()
+
+def answer_models(agent_type: str) -> str:
+    """Models an agent type's answers come from under the current routing policy, for the answer cache key"""
+    if agent_role(agent_type) != "orchestrator":
+        return model_id
+    roles = ["orchestrator"] + (list(research_agents) if agent_type == "multi_agent_parallel" else [])
+    # Escalated branches fall back to the sidebar model, which is part of the key already
+    routes = ",".join(f"{role}={model_router.model_for_role(role, model_name)}" for role in roles)
+    return f"{model_id}|{routes}"
+
 def get_model():
-    profile = models[0]
+    """Get the Bedrock model of the agent being built: the routed model of its role, or the sidebar model"""
+    name = current_model_name()
+    if name == model_name:
+        return build_model(models, reasoning_mode)
+    # Extended thinking stays with the sidebar model; routed models answer directly
+    return build_model(info.get_model_info(name), "Disable")
+
+def build_model(profiles: list, reasoning_mode: str):
+    profile = profiles[0]
+    model_id = profile['model_id']
     if profile['model_type'] == 'nova':
         STOP_SEQUENCE = '"\n\n<thinking>", "\n<thinking>", " <thinking>"'
     elif profile['model_type'] == 'claude':
         STOP_SEQUENCE = "\n\nHuman:" 
 
-    if model_type == 'claude':
+    if profile['model_type'] == 'claude':
         maxOutputTokens = 4096  # 4k
     else:
         maxOutputTokens = 5120  # 5k
@@ -64,69 +184,135 @@ def get_model():
     maxReasoningOutputTokens = 64000
     thinking_budget = min(maxOutputTokens, maxReasoningOutputTokens-1000)
 
-    if reasoning_mode == 'Enable':
-        model = BedrockModel(
-            boto_client_config=Config(
-               read_timeout=900,
-               connect_timeout=900,
-               retries=dict(max_attempts=3, mode="adaptive"),
-            ),
-            model_id=model_id,
-            max_tokens=64000,
-            stop_sequences=[STOP_SEQUENCE],
-            temperature=1,
-            additional_request_fields={
-                "thinking": {
-                    "type": "enabled",
-                    "budget_tokens": thinking_budget,
-                }
-            },
-        )
-    else:
-        model = BedrockModel(
-            boto_client_config=Config(
-               read_timeout=900,
-               connect_timeout=900,
-               retries=dict(max_attempts=3, mode="adaptive"),
-            ),
-            model_id=model_id,
-            max_tokens=maxOutputTokens,
-            stop_sequences=[STOP_SEQUENCE],
-            temperature=0.1,
-            top_p=0.9,
-            additional_request_fields={
-                "thinking": {
-                    "type": "disabled"
+    max_tokens = maxReasoningOutputTokens if reasoning_mode == 'Enable' else maxOutputTokens
+    regions = tuple(p['bedrock_region'] for p in profiles)
+    cache_config = get_prompt_cache_config(model_id)
+    key = (model_id, regions, reasoning_mode, max_tokens, tuple(sorted(cache_config)))
+
+    with _model_cache_lock:
+        model = _model_cache.get(key)
+        if model is not None:
+            return model
+
+        if reasoning_mode == 'Enable':
+            model = RegionRoutedBedrockModel(
+                profiles=profiles,
+                boto_client_config=boto_client_config,
+                model_id=model_id,
+                max_tokens=max_tokens,
+                stop_sequences=[STOP_SEQUENCE],
+                usage_listener=record_model_usage,
+                **cache_config,
+                temperature=1,
+                additional_request_fields={
+                    "thinking": {
+                        "type": "enabled",
+                        "budget_tokens": thinking_budget,
+                    }
+                },
+            )
+        else:
+            model = RegionRoutedBedrockModel(
+                profiles=profiles,
+                boto_client_config=boto_client_config,
+                model_id=model_id,
+                max_tokens=max_tokens,
+                stop_sequences=[STOP_SEQUENCE],
+                usage_listener=record_model_usage,
+                **cache_config,
+                temperature=0.1,
+                top_p=0.9,
+                additional_request_fields={
+                    "thinking": {
+                        "type": "disabled"
+                    }
                 }
-            }
-        )
+            )
+        _model_cache[key] = model
+        logger.info(f"model created: {key}")
     return model
 
-# Conversation manager for maintaining context
-conversation_manager = SlidingWindowConversationManager(
-    window_size=5,  # Reduced from 10 to 5 to prevent token overflow
-)
+# Per-session conversation histories, bounded by CONVERSATION_MEMORY_BUDGET_MB; each
+# history is kept under CONVERSATION_TOKEN_BUDGET by eliding old tool results and
+# folding old turns into a rolling summary
+conversation_store = ConversationStore(manager_factory=TokenBudgetConversationManager)
+
+# Session of the current turn; sub-agents run on Strands worker threads and
+# read it from the calling agent's trace attributes instead
+current_session_id = contextvars.ContextVar("current_session_id", default="default")
+
+def resolve_session_id(agent=None) -> str:
+    """Get the session id of the current turn, preferring the one carried by the calling agent"""
+    if agent is not None:
+        session_id = getattr(agent, "trace_attributes", {}).get("session.id")
+        if session_id:
+            return session_id
+    return current_session_id.get()
+
+def bind_request(agent):
+    """Tag an agent with the current session and request so its tool calls, which run on
+    Strands' thread pool without this context, can find the turn and its deadline"""
+    agent.trace_attributes.setdefault("session.id", current_session_id.get())
+    deadline = deadlines.current()
+    if deadline is not None:
+        agent.trace_attributes["request.id"] = deadline.request_id
+
+def get_abandoned_work_stats() -> dict:
+    """Get the counts of cancelled and timed-out work per stage (turn, agent, branch, bedrock, mcp)"""
+    return deadlines.get_stats()
+
+def session_history(namespace: str, agent=None) -> dict:
+    """
+    Agent keyword arguments carrying the session's history for one agent
+
+    Args:
+        namespace: Agent the history belongs to (e.g. 'chembl')
+        agent: Calling agent when running as a tool, used to find the session
+
+    Returns:
+        Dictionary with messages, conversation_manager and trace_attributes
+    """
+    session_id = resolve_session_id(agent)
+    return {
+        "messages": conversation_store.get_messages(session_id, namespace),
+        "conversation_manager": conversation_store.get_conversation_manager(session_id),
+        "trace_attributes": {"session.id": session_id},
+    }
+
+def stdio_client_factory(client_type: str, command: str, args: list):
+    """Build an MCPClient factory for a stdio server whose tool list changes invalidate the catalog cache"""
+    def transport():
+        return stdio_client(StdioServerParameters(command=command, args=args))
+
+    return lambda: MCPClient(watch_tools_list_changed(
+        transport, lambda: _session_manager.invalidate_tools(client_type)
+    ))
+
+# Process-wide pool of warm MCP client sessions, shared across turns and Streamlit reruns
+mcp_client_pool = MCPClientPool()
 
 # MCP Client for Tavily web search
-tavily_mcp_client = MCPClient(lambda: stdio_client(
-    StdioServerParameters(command="python", args=["application/mcp_server_tavily.py"])
+mcp_client_pool.register("tavily", stdio_client_factory(
+    "tavily", command="python", args=["application/mcp_server_tavily.py"]
 ))
 
 # MCP Client for ChEMBL database
-chembl_mcp_client = MCPClient(lambda: stdio_client(
-    StdioServerParameters(command="node", args=["application/ChEMBL-MCP-Server/build/index.js"])
+mcp_client_pool.register("chembl", stdio_client_factory(
+    "chembl", command="node", args=["application/ChEMBL-MCP-Server/build/index.js"]
 ))
 
 # MCP Client for UniProt database
-uniprot_mcp_client = MCPClient(lambda: stdio_client(
-    StdioServerParameters(command="node", args=["application/UniProt-MCP-Server/build/index.js"])
+mcp_client_pool.register("uniprot", stdio_client_factory(
+    "uniprot", command="node", args=["application/UniProt-MCP-Server/build/index.js"]
 ))
 
 # MCP Client for PDB database
-pdb_mcp_client = MCPClient(lambda: stdio_client(
-    StdioServerParameters(command="node", args=["application/PDB-MCP-Server/build/index.js"])
+mcp_client_pool.register("pdb", stdio_client_factory(
+    "pdb", command="node", args=["application/PDB-MCP-Server/build/index.js"]
 ))
 
+atexit.register(mcp_client_pool.shutdown)
+
 #########################################################
 # MCP Client Session Distribution Mechanism
 #########################################################
@@ -134,9 +320,22 @@ pdb_mcp_client = MCPClient(lambda: stdio_client(
 class MCPClientSessionManager:
     """Manages and distributes MCP client sessions to specialized agent tools"""
 
-    def __init__(self):
+    def __init__(self, pool: MCPClientPool = None, tool_cache: ToolResultCache = None):
+        self._pool = pool
+        # Memoized tool results shared by every agent, so identical calls do not hit EBI/RCSB again
+        self.tool_cache = tool_cache
+        # Optional Prefetcher the cache-backed tools report their results to
+        self.prefetcher = None
         self._active_clients = {}
         self._session_status = {}
+        # Per-server tool definitions, fetched once and rebound to whichever session serves the call
+        self._tool_catalogs = {}
+        self._catalog_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+        self._catalog_lock = threading.Lock()
+
+        if pool is not None:
+            for client_type in pool.get_status():
+                pool.get_server(client_type).add_restart_listener(self.invalidate_tools)
 
     def set_active_clients(self, client_sessions: dict):
         """
@@ -146,6 +345,8 @@ class MCPClientSessionManager:
             client_sessions: Dictionary mapping client types to active MCP client instances
         """
         self._active_clients = client_sessions.copy()
+        # Explicit clients may expose a different tool list than the pooled ones
+        self.invalidate_tools()
         # Track session status for each client
         for client_type, client in client_sessions.items():
             self._session_status[client_type] = {
@@ -167,52 +368,177 @@ class MCPClientSessionManager:
         Returns:
             Active MCP client instance or None if not available
         """
+        # Explicitly set clients take precedence over the shared pool
         if client_type in self._active_clients:
             client = self._active_clients[client_type]
             # Update last used timestamp
-            import datetime
-
-            self._session_status[client_type]["last_used"] = datetime.datetime.now()
+            self._session_status[client_type]["last_used"] = datetime.now()
             return client
+
+        if self._pool is not None and self._pool.has_server(client_type):
+            try:
+                return self._pool.get(client_type)
+            except Exception as e:
+                logger.error(f"Failed to get pooled MCP client '{client_type}': {e}")
         return None
 
+    def get_tools(self, client_type: str) -> list:
+        """
+        Get the tools of an MCP server, using the cached tool catalog when possible
+
+        Args:
+            client_type: Type of client ('tavily', 'chembl', 'uniprot', 'pdb')
+
+        Returns:
+            List of MCPAgentTool bound to an active client session (memoized through the tool
+            result cache if one is set), or an empty list if unavailable or the tools cannot be listed
+        """
+        client = self.get_client(client_type)
+        if client is None:
+            return []
+
+        with self._catalog_lock:
+            catalog = self._tool_catalogs.get(client_type)
+            if catalog is not None:
+                self._catalog_stats["hits"] += 1
+
+        if catalog is None:
+            try:
+                tools = client.list_tools_sync()
+            except Exception as e:
+                # A half-dead session; the agent builders report an empty tool list as an invalid session
+                logger.error(f"Failed to list the {client_type} tools: {e}")
+                return []
+            catalog = [tool.mcp_tool for tool in tools]
+            with self._catalog_lock:
+                self._catalog_stats["misses"] += 1
+                if catalog:
+                    self._tool_catalogs[client_type] = catalog
+            logger.info(f"{client_type} tool catalog cached: {len(catalog)} tools")
+
+        if self.tool_cache is None:
+            return [MCPAgentTool(mcp_tool, client) for mcp_tool in catalog]
+        return [
+            CachingMCPAgentTool(mcp_tool, client, client_type, self.tool_cache, self.prefetcher) for mcp_tool in catalog
+        ]
+
+    def invalidate_tools(self, client_type: str = None):
+        """
+        Drop the cached tool catalog of a server (all servers if client_type is None)
+
+        Called when a server session is restarted or announces tools/list_changed.
+        """
+        with self._catalog_lock:
+            if client_type is None:
+                self._tool_catalogs.clear()
+            else:
+                self._tool_catalogs.pop(client_type, None)
+            self._catalog_stats["invalidations"] += 1
+        logger.info(f"Tool catalog invalidated: {client_type or 'all'}")
+
+    def get_tool_cache_stats(self) -> dict:
+        """Get hit/miss counters of the tool result cache"""
+        return self.tool_cache.get_stats() if self.tool_cache is not None else {}
+
+    def get_prefetch_stats(self) -> dict:
+        """Get scheduled/completed/cancelled/used counters of the prefetcher"""
+        return self.prefetcher.get_stats() if self.prefetcher is not None else {}
+
+    def get_tool_catalog_stats(self) -> dict:
+        """Get hit/miss counters and cached tool counts of the tool catalog cache"""
+        with self._catalog_lock:
+            return {
+                **self._catalog_stats,
+                "cached": {k: len(v) for k, v in self._tool_catalogs.items()},
+            }
+
     def get_all_clients(self) -> dict:
         """Return dictionary of all active MCP client sessions"""
         return self._active_clients.copy()
 
     def is_client_available(self, client_type: str) -> bool:
         """Check if a specific client type is available and active"""
-        return client_type in self._active_clients and self._session_status.get(
-            client_type, {}
-        ).get("active", False)
+        if client_type in self._active_clients:
+            return self._session_status.get(client_type, {}).get("active", False)
+        return self._pool is not None and self._pool.has_server(client_type)
 
     def get_session_status(self) -> dict:
         """Get status information for all client sessions"""
-        return self._session_status.copy()
+        status = self._session_status.copy()
+        if self._pool is not None:
+            for client_type, pool_status in self._pool.get_status().items():
+                status.setdefault(client_type, pool_status)
+        return status
 
 
 # Global session manager instance
-_session_manager = MCPClientSessionManager()
+_session_manager = MCPClientSessionManager(mcp_client_pool, ToolResultCache())
+# Warms the shared tool result cache with the cross-database lookups multi-server turns make next
+_session_manager.prefetcher = Prefetcher(_session_manager.get_tools, _session_manager.tool_cache)
+atexit.register(_session_manager.prefetcher.shutdown)
+
+def warmup(servers: list = None, modelName: str = None, reasoningMode: str = None) -> dict:
+    """
+    Start MCP server sessions and create the Bedrock clients ahead of the first question
+
+    The model is only prebuilt into the model cache; the current selection is left
+    to update(), which the UI thread calls.
+
+    Args:
+        servers: MCP servers to start (all registered servers if None)
+        modelName: Model to prebuild (default: the current model)
+        reasoningMode: 'Enable' or 'Disable' (default: the current mode)
+
+    Returns:
+        Seconds spent per warmed component
+    """
+    timings = {}
+    start = time.perf_counter()
+    # Creates the per-region bedrock-runtime clients
+    build_model(info.get_model_info(modelName or model_name), reasoningMode or reasoning_mode)
+    timings["bedrock"] = round(time.perf_counter() - start, 3)
+
+    def warm(name):
+        start = time.perf_counter()
+        try:
+            mcp_client_pool.warm(name)
+            if mcp_client_pool.get_status()[name]["alive"]:
+                _session_manager.get_tools(name)  # caches the tool catalog
+        except Exception as e:
+            logger.error(f"Warmup of MCP server '{name}' failed: {e}")
+        timings[f"mcp.{name}"] = round(time.perf_counter() - start, 3)
+
+    # Servers start concurrently; each is a separate process
+    threads = [
+        threading.Thread(target=warm, args=(name,), name=f"warmup-{name}", daemon=True)
+        for name in servers or list(mcp_client_pool.get_status())
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return timings
 
 #########################################################
 # Specialized Tool Agents
 @tool
-def web_search_agent(query: str, search_type: str = "general", history_mode: str = "Enable") -> str:
+def web_search_agent(query: str, search_type: str = "general", history_mode: str = "Enable", agent: Agent = None) -> str:
     """
     Specialized agent for searching the web using Tavily's search engine.
 
     Args:
         query: The search query
         search_type: Type of search to perform - "general", "answer", or "news" (default: "general")
+        history_mode: Whether to enable conversation history (default: "Enable")
+        agent: Calling agent, injected by Strands when run as a tool
 
     Returns:
         Structured information from web search results
     """
-    client = _session_manager.get_client("tavily")
-    if client is None:
+    if not _session_manager.is_client_available("tavily"):
         return "Error: Tavily client session not available"
     # Validate client session is usable
-    tavily_tools = client.list_tools_sync()
+    tavily_tools = _session_manager.get_tools("tavily")
     if not tavily_tools:
         error_msg = (
             "Error: Tavily client session is invalid or has no available tools"
@@ -220,7 +546,7 @@ def web_search_agent(query: str, search_type: str = "general", history_mode: str
         logger.error(error_msg)
         return error_msg
 
-    logger.info(f"tavily_tools: {tavily_tools}")
+    logger.info(f"tavily_tools: {len(tavily_tools)} tools")
 
     # Create a specialized web search agent
     system_prompt = """
@@ -228,6 +554,7 @@ def web_search_agent(query: str, search_type: str = "general", history_mode: str
     - 일반 검색: 포괄적 결과 반환
     - 답변 검색: 증빙과 함께 직접 답변
     - 뉴스 검색: 최근 뉴스 기사
+    - 관련 검색어가 여럿이면(예: 타겟별, 화합물별) tavily_batch_search로 한 번에 검색
     정보 언급 시 [제목](URL) 형태로 출처 표기하세요.
     """
 
@@ -240,7 +567,7 @@ def web_search_agent(query: str, search_type: str = "general", history_mode: str
             model=model,
             system_prompt=system_prompt,
             tools=tavily_tools,
-            conversation_manager=conversation_manager,
+            **session_history("web_search", agent),
         )
     else:
         logger.info("history_mode: Disable")
@@ -248,7 +575,7 @@ def web_search_agent(query: str, search_type: str = "general", history_mode: str
     return web_agent
 
 @tool
-def chembl_agent(query: str, search_type: str = "compound", history_mode: str = "Enable") -> str:
+def chembl_agent(query: str, search_type: str = "compound", history_mode: str = "Enable", agent: Agent = None) -> str:
     """
     Specialized agent for searching ChEMBL database for drug discovery information.
 
@@ -256,16 +583,16 @@ def chembl_agent(query: str, search_type: str = "compound", history_mode: str =
         query: The search query
         search_type: Type of search - "compound", "target", "bioactivity", or "assay" (default: "compound")
         history_mode: Whether to enable conversation history (default: "Enable")
+        agent: Calling agent, injected by Strands when run as a tool
 
     Returns:
         Structured information from ChEMBL database
     """
-    client = _session_manager.get_client("chembl")
-    if client is None:
+    if not _session_manager.is_client_available("chembl"):
         return "Error: ChEMBL client session not available"
     
     # Validate client session is usable
-    chembl_tools = client.list_tools_sync()
+    chembl_tools = _session_manager.get_tools("chembl")
     if not chembl_tools:
         error_msg = (
             "Error: ChEMBL client session is invalid or has no available tools"
@@ -273,7 +600,11 @@ def chembl_agent(query: str, search_type: str = "compound", history_mode: str =
         logger.error(error_msg)
         return error_msg
 
-    logger.info(f"chembl_tools: {chembl_tools}")
+    logger.info(f"chembl_tools: {len(chembl_tools)} tools")
+
+    # Send only the tools relevant to this query; follow-ups keep the tools already used
+    history = session_history("chembl", agent) if history_mode == "Enable" else None
+    chembl_tools = select_tools(chembl_tools, query, search_type, history["messages"] if history else None)
 
     # Create a specialized ChEMBL search agent
     system_prompt = """
@@ -291,7 +622,7 @@ def chembl_agent(query: str, search_type: str = "compound", history_mode: str =
             model=model,
             system_prompt=system_prompt,
             tools=chembl_tools,
-            conversation_manager=conversation_manager,
+            **history,
         )
     else:
         logger.info("history_mode: Disable")
@@ -299,7 +630,7 @@ def chembl_agent(query: str, search_type: str = "compound", history_mode: str =
     return chembl_search_agent
 
 @tool
-def uniprot_agent(query: str, search_type: str = "protein", history_mode: str = "Enable") -> str:
+def uniprot_agent(query: str, search_type: str = "protein", history_mode: str = "Enable", agent: Agent = None) -> str:
     """
     Specialized agent for searching UniProt database for protein information.
 
@@ -307,16 +638,16 @@ def uniprot_agent(query: str, search_type: str = "protein", history_mode: str =
         query: The search query
         search_type: Type of search - "protein", "gene", "sequence", "feature", or "structure" (default: "protein")
         history_mode: Whether to enable conversation history (default: "Enable")
+        agent: Calling agent, injected by Strands when run as a tool
 
     Returns:
         Structured information from UniProt database
     """
-    client = _session_manager.get_client("uniprot")
-    if client is None:
+    if not _session_manager.is_client_available("uniprot"):
         return "Error: UniProt client session not available"
     
     # Validate client session is usable
-    uniprot_tools = client.list_tools_sync()
+    uniprot_tools = _session_manager.get_tools("uniprot")
     if not uniprot_tools:
         error_msg = (
             "Error: UniProt client session is invalid or has no available tools"
@@ -324,7 +655,11 @@ def uniprot_agent(query: str, search_type: str = "protein", history_mode: str =
         logger.error(error_msg)
         return error_msg
 
-    logger.info(f"uniprot_tools: {uniprot_tools}")
+    logger.info(f"uniprot_tools: {len(uniprot_tools)} tools")
+
+    # Send only the tools relevant to this query; follow-ups keep the tools already used
+    history = session_history("uniprot", agent) if history_mode == "Enable" else None
+    uniprot_tools = select_tools(uniprot_tools, query, search_type, history["messages"] if history else None)
 
     # Create a specialized UniProt search agent
     system_prompt = """
@@ -346,7 +681,7 @@ def uniprot_agent(query: str, search_type: str = "protein", history_mode: str =
             model=model,
             system_prompt=system_prompt,
             tools=uniprot_tools,
-            conversation_manager=conversation_manager,
+            **history,
         )
     else:
         logger.info("history_mode: Disable")
@@ -354,7 +689,7 @@ def uniprot_agent(query: str, search_type: str = "protein", history_mode: str =
     return uniprot_search_agent
 
 @tool
-def pdb_agent(query: str, search_type: str = "structure", history_mode: str = "Enable") -> str:
+def pdb_agent(query: str, search_type: str = "structure", history_mode: str = "Enable", agent: Agent = None) -> str:
     """
     Specialized agent for searching PDB database for protein structure information.
 
@@ -362,16 +697,16 @@ def pdb_agent(query: str, search_type: str = "structure", history_mode: str = "E
         query: The search query
         search_type: Type of search - "structure", "quality", "ligand", or "validation" (default: "structure")
         history_mode: Whether to enable conversation history (default: "Enable")
+        agent: Calling agent, injected by Strands when run as a tool
 
     Returns:
         Structured information from PDB database
     """
-    client = _session_manager.get_client("pdb")
-    if client is None:
+    if not _session_manager.is_client_available("pdb"):
         return "Error: PDB client session not available"
     
     # Validate client session is usable
-    pdb_tools = client.list_tools_sync()
+    pdb_tools = _session_manager.get_tools("pdb")
     if not pdb_tools:
         error_msg = (
             "Error: PDB client session is invalid or has no available tools"
@@ -379,7 +714,11 @@ def pdb_agent(query: str, search_type: str = "structure", history_mode: str = "E
         logger.error(error_msg)
         return error_msg
 
-    logger.info(f"pdb_tools: {pdb_tools}")
+    logger.info(f"pdb_tools: {len(pdb_tools)} tools")
+
+    # Send only the tools relevant to this query; follow-ups keep the tools already used
+    history = session_history("pdb", agent) if history_mode == "Enable" else None
+    pdb_tools = select_tools(pdb_tools, query, search_type, history["messages"] if history else None)
 
     # Create a specialized PDB search agent
     system_prompt = """
@@ -402,7 +741,7 @@ def pdb_agent(query: str, search_type: str = "structure", history_mode: str = "E
             model=model,
             system_prompt=system_prompt,
             tools=pdb_tools,
-            conversation_manager=conversation_manager,
+            **history,
         )
     else:
         logger.info("history_mode: Disable")
@@ -450,7 +789,7 @@ def multi_agent_orchestrator(query: str, research_type: str = "comprehensive", h
             model=model,
             system_prompt=ORCHESTRATOR_SYSTEM_PROMPT,
             tools=[chembl_agent, uniprot_agent, pdb_agent],
-            conversation_manager=conversation_manager,
+            **session_history("multi_agent"),
         )
     else:
         logger.info("Multi-agent orchestrator with history disabled")
@@ -463,124 +802,486 @@ def multi_agent_orchestrator(query: str, research_type: str = "comprehensive", h
     return orchestrator
 
 
-def run_individual_agent(question, history_mode, st, agent_type):
+#########################################################
+# Parallel Research (concurrent sub-agent fan-out)
+#########################################################
+PARALLEL_MAX_CONCURRENCY = int(os.getenv("PARALLEL_MAX_CONCURRENCY", "3"))
+PARALLEL_BRANCH_TIMEOUT = float(os.getenv("PARALLEL_BRANCH_TIMEOUT", "180"))  # seconds
+
+# Database agents that can run as independent research branches
+research_agents = {
+    "chembl": chembl_agent,
+    "uniprot": uniprot_agent,
+    "pdb": pdb_agent,
+}
+
+research_agent_labels = {
+    "chembl": "ChEMBL (화합물/생물활성)",
+    "uniprot": "UniProt (단백질 서열/기능)",
+    "pdb": "PDB (단백질 3D 구조)",
+}
+
+def run_branch_agent(agent_type: str, query: str, model: str):
+    """Build one database agent on the given model and run it; returns the AgentResult and its elapsed seconds"""
+    routed_model_name.set(model)
+    # Branches run concurrently, so they must not share the conversation manager
+    agent = research_agents[agent_type](query=query, history_mode="Disable")
+    if isinstance(agent, str):  # error message from the agent builder
+        raise RuntimeError(agent)
+    bind_request(agent)
+    start = time.perf_counter()
+    try:
+        return agent(query), time.perf_counter() - start
+    except Exception as e:
+        abandoned = deadlines.abandoned_by(e)
+        if abandoned is not None:
+            raise abandoned from e
+        role_stats.record(agent_type, model, time.perf_counter() - start, failed=True, escalated=model != model_name)
+        raise
+
+def run_research_branch(agent_type: str, query: str) -> str:
+    """
+    Run one database agent to completion without history and return its answer
+
+    The agent runs on the model the routing policy assigns to its role. When that
+    is not the sidebar model and it fails or gives a weak answer, the branch is
+    run once more on the sidebar model.
+    """
+    # Runs in its own context copy, so the name and model only apply to this branch
+    current_agent_name.set(agent_type)
+    routed = model_router.model_for_role(agent_type, model_name)
+    with tracing.span("research_branch", agent_type=agent_type, model=routed) as span:
+        try:
+            result, elapsed = run_branch_agent(agent_type, query, routed)
+        except Exception as e:
+            abandoned = deadlines.abandoned_by(e)
+            if abandoned is not None:
+                raise abandoned from e
+            if routed == model_name:
+                raise
+            result, reason = None, f"error: {e}"
+        else:
+            reason = model_router.escalation_reason(result) if routed != model_name else None
+            usage = result.metrics.accumulated_usage
+            role_stats.record(agent_type, routed, elapsed, usage, escalated=reason is not None)
+
+        if reason:
+            # Nobody waits for the answer of an abandoned request; do not pay for a second run
+            deadline = deadlines.current()
+            if deadline is not None:
+                deadline.check("branch")
+            logger.info(f"research branch {agent_type}: escalating from {routed} to {model_name} ({reason})")
+            span.set_attributes({"escalated_from": routed, "escalation_reason": reason})
+            result, elapsed = run_branch_agent(agent_type, query, model_name)
+            role_stats.record(agent_type, model_name, elapsed, result.metrics.accumulated_usage)
+        record_usage(span, result)
+        return str(result)
+
+def run_parallel_research(
+    query: str,
+    agent_types: list,
+    max_concurrency: int = PARALLEL_MAX_CONCURRENCY,
+    branch_timeout: float = PARALLEL_BRANCH_TIMEOUT,
+) -> tuple:
+    """
+    Dispatch database agents concurrently and collect whatever finishes in time
+
+    Each branch gets its own timeout measured from the moment it starts running.
+    A branch that times out is abandoned (its thread cannot be killed) and
+    reported as missing, so one slow database does not block the answer.
+
+    Args:
+        query: The research query
+        agent_types: Research agent types to dispatch
+        max_concurrency: Maximum number of branches running at once
+        branch_timeout: Seconds a single branch may run
+
+    Returns:
+        Tuple of a dictionary mapping agent type to {"status", "text", "elapsed"} and
+        whether every branch succeeded
+    """
+    results = {}
+    started_at = {}
+    turn_deadline = deadlines.current()
+
+    def branch(agent_type):
+        started_at[agent_type] = time.time()
+        # The branch timeout is enforced inside the branch too, so an abandoned branch stops
+        # calling Bedrock and MCP instead of running on in the background
+        deadlines.start(branch_timeout, parent=turn_deadline)
+        return run_research_branch(agent_type, query)
+
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(max_concurrency, len(agent_types))), thread_name_prefix="research"
+    )
+    # Each branch runs in a copy of the caller's context so its spans join the turn's trace
+    pending = {
+        executor.submit(contextvars.copy_context().run, branch, agent_type): agent_type for agent_type in agent_types
+    }
+    try:
+        while pending:
+            done, _ = wait(list(pending), timeout=0.5, return_when=FIRST_COMPLETED)
+            for future in done:
+                agent_type = pending.pop(future)
+                elapsed = time.time() - started_at.get(agent_type, time.time())
+                try:
+                    results[agent_type] = {"status": "success", "text": future.result(), "elapsed": elapsed}
+                except Exception as e:
+                    logger.error(f"research branch {agent_type} failed: {e}")
+                    results[agent_type] = {"status": "error", "text": str(e), "elapsed": elapsed}
+                logger.info(f"research branch {agent_type}: {results[agent_type]['status']} ({elapsed:.1f}s)")
+
+            now = time.time()
+            turn_over = turn_deadline is not None and turn_deadline.expired()
+            for future, agent_type in list(pending.items()):
+                if turn_over or (agent_type in started_at and now - started_at[agent_type] > branch_timeout):
+                    reason = turn_deadline.reason if turn_over else "timeout"
+                    logger.warning(f"research branch {agent_type} abandoned ({reason})")
+                    deadlines.record("branch", reason)
+                    future.cancel()
+                    pending.pop(future)
+                    elapsed = now - started_at.get(agent_type, now)
+                    results[agent_type] = {"status": "timeout", "text": "", "elapsed": elapsed}
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    complete = all(result["status"] == "success" for result in results.values())
+    return results, complete
+
+def build_synthesis_prompt(query: str, results: dict) -> str:
+    """Combine the research branch results into one prompt for the synthesis step"""
+    sections = [f"연구 질문: {query}", ""]
+    for agent_type, result in results.items():
+        label = research_agent_labels.get(agent_type, agent_type)
+        if result["status"] == "success":
+            sections.append(f"## {label} 결과\n{result['text']}")
+        elif result["status"] == "timeout":
+            sections.append(f"## {label} 결과\n(시간 초과로 결과를 받지 못했습니다)")
+        else:
+            sections.append(f"## {label} 결과\n(오류로 결과를 받지 못했습니다: {result['text']})")
+    return "\n\n".join(sections)
+
+def synthesis_agent(history_mode: str = "Enable"):
+    """Create the agent that integrates the parallel research results into one answer"""
+    SYNTHESIS_SYSTEM_PROMPT = """
+    당신은 신약 개발 연구를 위한 종합 분석가입니다.
+    ChEMBL, UniProt, PDB 전문 에이전트가 동시에 조사한 결과를 받아 하나의 통합 분석으로 정리합니다.
+    - 화합물, 타겟 단백질, 3D 구조 정보를 교차 참조하여 연결하세요.
+    - 결과를 받지 못한 데이터베이스가 있으면 그 사실을 명시하고 가능한 범위에서 분석하세요.
+    - 제공된 결과에 없는 내용은 추측하지 마세요.
+    한글로 답변합니다.
+    """
+
+    model = get_model()
+
+    if history_mode == "Enable":
+        logger.info("Synthesis agent with history enabled")
+        return Agent(
+            model=model,
+            system_prompt=SYNTHESIS_SYSTEM_PROMPT,
+            **session_history("multi_agent_parallel"),
+        )
+    logger.info("Synthesis agent with history disabled")
+    return Agent(model=model, system_prompt=SYNTHESIS_SYSTEM_PROMPT)
+
+
+# Agent builders and the MCP servers each agent type needs
+agent_registry = {
+    "web_search": (web_search_agent, ("tavily",)),
+    "chembl": (chembl_agent, ("chembl",)),
+    "uniprot": (uniprot_agent, ("uniprot",)),
+    "pdb": (pdb_agent, ("pdb",)),
+    "multi_agent": (multi_agent_orchestrator, ("chembl", "uniprot", "pdb")),
+    "multi_agent_parallel": (synthesis_agent, ("chembl", "uniprot", "pdb")),
+}
+
+#########################################################
+# Agent Turn Execution
+#########################################################
+# Long-lived event loop the Streamlit thread submits turns to, so async
+# resources are not torn down with a per-message asyncio.run()
+agent_event_loop = BackgroundEventLoop()
+atexit.register(agent_event_loop.shutdown)
+
+RENDER_POLL_INTERVAL = 0.1  # seconds
+
+# Final answers of context-free questions, shared across sessions (ANSWER_CACHE_PATH)
+answer_cache = AnswerCache()
+
+class AgentCancelled(Exception):
+    """Raised inside an agent's event loop to stop a cancelled turn"""
+
+def record_usage(span, result):
+    """Add the token usage of an AgentResult to a span"""
+    if not tracing.is_enabled():
+        return
+    usage = getattr(getattr(result, "metrics", None), "accumulated_usage", None) or {}
+    span.set_attributes({
+        "tokens.input": usage.get("inputTokens", 0),
+        "tokens.output": usage.get("outputTokens", 0),
+    })
+
+async def stream_agent(agent, prompt: str, name: str = "agent"):
+    """
+    Stream an agent's callback events on the current event loop
+
+    Unlike Agent.stream_async, cancelling this generator does not join the
+    agent's worker thread on the (shared) loop; the agent is stopped with
+    AgentCancelled at its next callback event instead.
+
+    Args:
+        agent: Agent to run
+        prompt: Prompt to send
+        name: Agent name recorded on the trace span
+
+    Yields:
+        Callback events such as {"data": "..."}
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    done = object()
+    cancelled = threading.Event()
+
+    def post(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:  # loop already stopped
+            pass
+
+    first_token = []
+    deadline = deadlines.current()
+
+    def callback_handler(**event):
+        if cancelled.is_set():
+            raise AgentCancelled("turn was cancelled")
+        if deadline is not None:
+            deadline.check("agent")
+        if "data" in event and not first_token:
+            first_token.append(time.perf_counter())
+        post(event)
+
+    def run():
+        current_agent_name.set(name)
+        with tracing.span("agent.invoke", agent=name, prompt_chars=len(prompt)) as span:
+            start = time.perf_counter()
+            model = current_model_name()
+            try:
+                result = agent(prompt)
+                record_usage(span, result)
+                usage = result.metrics.accumulated_usage
+                role_stats.record(agent_role(name), model, time.perf_counter() - start, usage)
+            except BaseException as e:
+                span.record_exception(e)
+                if not isinstance(e, (AgentCancelled, RequestAbandoned)):
+                    role_stats.record(agent_role(name), model, time.perf_counter() - start, failed=True)
+                post(e)
+            finally:
+                if first_token:
+                    span.set_attribute("ttft_ms", round((first_token[0] - start) * 1000, 1))
+                post(done)
+
+    agent.callback_handler = callback_handler
+    bind_request(agent)
+    # Run in a copy of this task's context so the agent's spans nest under the turn
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(run,), name="agent-turn", daemon=True).start()
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        cancelled.set()
+
+async def run_agent_turn(
+    question, history_mode, agent_type, session_id="default", use_cache=True, emit=None,
+    timeout=deadlines.REQUEST_TIMEOUT,
+):
+    """
+    Run one agent turn on the current event loop, independently of Streamlit
+
+    Questions asked without prior context are answered from the answer cache
+    when possible. Errors propagate to the caller.
+
+    The turn gets a deadline that its agent, research branches, Bedrock streams
+    and MCP tool calls check before doing more work. Cancelling the turn (e.g. a
+    newer question from the same session) or running past the timeout ends that
+    work at its next check.
+
+    Args:
+        question: User's query
+        history_mode: Whether to enable conversation history
+        agent_type: Type of agent to run ('web_search', 'chembl', 'uniprot', 'pdb', 'multi_agent', or 'multi_agent_parallel')
+        session_id: Identifier the conversation history belongs to
+        use_cache: Whether to read from and write to the answer cache
+        emit: Optional callback receiving ('status', message) and ('data', chunk) events
+        timeout: Seconds the whole turn may take (None for no limit)
+
+    Returns:
+        The full response text
+
+    Raises:
+        asyncio.TimeoutError: If the turn did not finish within the timeout
+    """
+    emit = emit or (lambda kind, payload: None)
+    if agent_type not in agent_registry:
+        # Default to web search if unknown agent type
+        agent_type = "web_search"
+    current_session_id.set(session_id)
+    deadline = deadlines.start(timeout)
+
+    with tracing.turn_span("agent_turn", session_id, agent_type=agent_type, model_id=model_id) as span:
+        try:
+            response = await asyncio.wait_for(
+                _run_agent_turn(question, history_mode, agent_type, session_id, use_cache, emit, span),
+                deadline.remaining(),
+            )
+        except asyncio.CancelledError:
+            deadline.cancel("superseded")
+            deadlines.record("turn", "superseded")
+            raise
+        except (asyncio.TimeoutError, RequestAbandoned) as e:
+            reason = deadline.reason or "timeout"
+            deadline.cancel(reason)
+            deadlines.record("turn", reason)
+            span.set_attribute("abandoned", reason)
+            raise asyncio.TimeoutError(f"turn {reason} after {timeout}s") from e
+        span.set_attribute("response_chars", len(response))
+        return response
+
+async def _run_agent_turn(question, history_mode, agent_type, session_id, use_cache, emit, span):
+    builder, client_types = agent_registry[agent_type]
+
+    # Only context-free turns are cached: a follow-up question means
+    # something else in another conversation
+    history = conversation_store.get_messages(session_id, agent_type) if history_mode == "Enable" else []
+    cacheable = use_cache and not history
+    cache_key = (question, agent_type, answer_models(agent_type), reasoning_mode)
+    if cacheable:
+        cached = await asyncio.to_thread(answer_cache.get, *cache_key)
+        span.set_attribute("answer_cache.hit", cached is not None)
+        if cached is not None:
+            if history_mode == "Enable":
+                # Keep the conversation coherent for follow-up questions
+                history.append({"role": "user", "content": [{"text": question}]})
+                history.append({"role": "assistant", "content": [{"text": cached}]})
+            emit("data", cached)
+            return cached
+
+    # Hold the client sessions this agent type needs for the whole turn; prefetches stop with it
+    prefetch_turn = _session_manager.prefetcher.turn(session_id, client_types)
+    with mcp_client_pool.lease(*client_types), conversation_store.session(session_id), prefetch_turn:
+        if agent_role(agent_type) == "orchestrator":
+            # Single agents keep the sidebar model; research branches route their own roles
+            routed_model_name.set(model_router.model_for_role("orchestrator", model_name))
+        # Spawning a server and listing its tools block; do it off the loop so the builders
+        # below find a warm session and a cached tool catalog
+        await asyncio.gather(*(asyncio.to_thread(_session_manager.get_tools, t) for t in client_types))
+        if agent_type == "multi_agent_parallel":
+            # Fan the question out to the database agents concurrently, then synthesize once
+            emit("status", "ChEMBL, UniProt, PDB 에이전트가 병렬로 조사 중입니다...")
+            results, complete = await asyncio.to_thread(
+                run_parallel_research, question, list(research_agents)
+            )
+            # A synthesis missing some databases is not worth keeping for later askers
+            cacheable = cacheable and complete
+            agent = builder(history_mode)
+            prompt = build_synthesis_prompt(question, results)
+        else:
+            agent = builder(question, history_mode=history_mode)
+            prompt = question
+
+        if isinstance(agent, str):  # error message from the agent builder
+            emit("data", agent)
+            return agent
+
+        chunks = []
+        async for event in stream_agent(agent, prompt, name=agent_type):
+            if "data" in event:
+                chunks.append(event["data"])
+                emit("data", event["data"])
+
+    response = "".join(chunks)
+    if cacheable:
+        await asyncio.to_thread(answer_cache.put, *cache_key, response)
+    return response
+
+def run_individual_agent(
+    question, history_mode, st, agent_type, session_id=None, use_cache=True, timeout=deadlines.REQUEST_TIMEOUT
+):
     """
     Run a specific individual agent based on user selection
     
+    The turn runs on the background event loop; the Streamlit thread only
+    renders the streamed chunks. A new turn from the same session cancels
+    the previous one.
+
     Args:
         question: User's query
         history_mode: Whether to enable conversation history
         st: Streamlit object for UI updates
-        agent_type: Type of agent to run ('web_search', 'chembl', 'uniprot', 'pdb', or 'multi_agent')
-        
+        agent_type: Type of agent to run ('web_search', 'chembl', 'uniprot', 'pdb', 'multi_agent', or 'multi_agent_parallel')
+        session_id: Streamlit session identifier the conversation history belongs to
+        use_cache: Whether to read from and write to the answer cache
+        timeout: Seconds the turn may take before its remaining work is abandoned
+
     Returns:
         Agent response
     """
-    message_placeholder = st.empty()
-    full_response = ""
-    
+    renderer = StreamingRenderer(st.empty())
+    # Streamlit elements may only be touched from the script thread, so the
+    # turn hands its output over through a thread-safe queue
+    outbox = queue.Queue()
+    turn_done = object()
+
+    session_id = session_id or "default"
+
     async def process_streaming_response():
-        nonlocal full_response
         try:
-            # Initialize client sessions based on agent type
-            if agent_type == "web_search":
-                with tavily_mcp_client as tavily_client:
-                    client_sessions = {
-                        "tavily": tavily_client,
-                    }
-                    _session_manager.set_active_clients(client_sessions)
-                    
-                    agent = web_search_agent(history_mode)
-                    agent_stream = agent.stream_async(question)
-                    async for event in agent_stream:
-                        if "data" in event:
-                            full_response += event["data"]
-                            message_placeholder.markdown(full_response)
-            
-            elif agent_type == "chembl":
-                with chembl_mcp_client as chembl_client:
-                    client_sessions = {
-                        "chembl": chembl_client,
-                    }
-                    _session_manager.set_active_clients(client_sessions)
-                    
-                    agent = chembl_agent(history_mode)
-                    agent_stream = agent.stream_async(question)
-                    async for event in agent_stream:
-                        if "data" in event:
-                            full_response += event["data"]
-                            message_placeholder.markdown(full_response)
-            
-            elif agent_type == "uniprot":
-                with uniprot_mcp_client as uniprot_client:
-                    client_sessions = {
-                        "uniprot": uniprot_client,
-                    }
-                    _session_manager.set_active_clients(client_sessions)
-                    
-                    agent = uniprot_agent(history_mode)
-                    agent_stream = agent.stream_async(question)
-                    async for event in agent_stream:
-                        if "data" in event:
-                            full_response += event["data"]
-                            message_placeholder.markdown(full_response)
-            
-            elif agent_type == "pdb":
-                with pdb_mcp_client as pdb_client:
-                    client_sessions = {
-                        "pdb": pdb_client,
-                    }
-                    _session_manager.set_active_clients(client_sessions)
-                    
-                    agent = pdb_agent(history_mode)
-                    agent_stream = agent.stream_async(question)
-                    async for event in agent_stream:
-                        if "data" in event:
-                            full_response += event["data"]
-                            message_placeholder.markdown(full_response)
-            
-            elif agent_type == "multi_agent":
-                # Multi-agent orchestrator needs all three database clients
-                with chembl_mcp_client as chembl_client, \
-                     uniprot_mcp_client as uniprot_client, \
-                     pdb_mcp_client as pdb_client:
-                    
-                    client_sessions = {
-                        "chembl": chembl_client,
-                        "uniprot": uniprot_client,
-                        "pdb": pdb_client,
-                    }
-                    _session_manager.set_active_clients(client_sessions)
-                    
-                    agent = multi_agent_orchestrator(history_mode)
-                    agent_stream = agent.stream_async(question)
-                    async for event in agent_stream:
-                        if "data" in event:
-                            full_response += event["data"]
-                            message_placeholder.markdown(full_response)
-            
-            else:
-                # Default to web search if unknown agent type
-                with tavily_mcp_client as tavily_client:
-                    client_sessions = {
-                        "tavily": tavily_client,
-                    }
-                    _session_manager.set_active_clients(client_sessions)
-                    
-                    agent = web_search_agent(history_mode)
-                    agent_stream = agent.stream_async(question)
-                    async for event in agent_stream:
-                        if "data" in event:
-                            full_response += event["data"]
-                            message_placeholder.markdown(full_response)
-
+            await run_agent_turn(
+                question, history_mode, agent_type, session_id, use_cache,
+                emit=lambda kind, payload: outbox.put((kind, payload)),
+                timeout=timeout,
+            )
+        except asyncio.CancelledError:
+            logger.info(f"Turn cancelled: {session_id}")
+            raise
+        except asyncio.TimeoutError as e:
+            logger.warning(f"Turn abandoned: {session_id}: {e}")
+            outbox.put(("error", "Sorry, the request timed out before the response was complete."))
         except Exception as e:
             logger.error(f"Error in streaming response: {e}")
-            message_placeholder.markdown(
-                "Sorry, an error occurred while generating the response."
-            )
+            outbox.put(("error", "Sorry, an error occurred while generating the response."))
             logger.error(traceback.format_exc())  # Detailed error logging
 
-    asyncio.run(process_streaming_response())
-
-    return full_response
\ No newline at end of file
+    future = agent_event_loop.submit(process_streaming_response(), key=session_id)
+    future.add_done_callback(lambda f: outbox.put((turn_done, None)))
+
+    render_span = tracing.start_span("ui.render", session_id=session_id, agent_type=agent_type)
+    try:
+        while True:
+            try:
+                kind, payload = outbox.get(timeout=RENDER_POLL_INTERVAL)
+            except queue.Empty:
+                renderer.flush()
+                continue
+            if kind is turn_done:
+                break
+            elif kind == "data":
+                renderer.write(payload)
+            elif kind == "status":
+                renderer.show(payload)
+            elif kind == "error":
+                renderer.placeholder.markdown(payload)
+                return renderer.text
+        renderer.close()
+    finally:
+        # A Streamlit rerun interrupts this thread; stop the turn it was rendering
+        if not future.done():
+            future.cancel()
+        render_span.set_attributes({"flushes": renderer.flush_count, "response_chars": len(renderer.text)})
+        render_span.end()
+
+    return renderer.text
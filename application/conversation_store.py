@@ -0,0 +1,360 @@
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+from strands.agent.conversation_manager import ConversationManager, SlidingWindowConversationManager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_BUDGET = int(float(os.getenv("CONVERSATION_MEMORY_BUDGET_MB", "256")) * 1024 * 1024)  # bytes
+DEFAULT_IDLE_TTL = float(os.getenv("CONVERSATION_IDLE_TTL", "3600"))  # seconds
+DEFAULT_SPILL_DIR = os.getenv("CONVERSATION_SPILL_DIR") or None
+DEFAULT_TOKEN_BUDGET = int(os.getenv("CONVERSATION_TOKEN_BUDGET", "12000"))  # estimated tokens of history
+DEFAULT_TOOL_RESULT_TOKENS = int(os.getenv("CONVERSATION_TOOL_RESULT_TOKENS", "500"))  # kept per old tool result
+DEFAULT_SUMMARY_TOKENS = 1500
+
+SUMMARY_MARKER = "[이전 대화 요약]"
+SUMMARY_ACK = "네, 이전 대화 요약을 참고하여 답변하겠습니다."
+ELIDED_MARKER = "...[이전 도구 결과 생략"
+
+
+def estimate_size(messages: list) -> int:
+    """Estimate the memory footprint of a message list by its serialized size"""
+    try:
+        return len(json.dumps(messages, default=str))
+    except Exception:
+        return sum(len(str(message)) for message in messages)
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the token count of a text (~4 ASCII characters or ~1.5 Korean characters per token)"""
+    ascii_chars = sum(1 for c in text if ord(c) < 128)
+    return int(ascii_chars / 4 + (len(text) - ascii_chars) / 1.5) + 1
+
+
+def truncate_to_tokens(text: str, tokens: int) -> str:
+    """Cut a text to roughly `tokens` estimated tokens"""
+    budget = tokens * 4.0
+    for i, c in enumerate(text):
+        budget -= 1 if ord(c) < 128 else 4 / 1.5
+        if budget < 0:
+            return text[:i]
+    return text
+
+
+def message_text(message: dict) -> str:
+    """Concatenate the text of a message, including the text of tool uses and tool results"""
+    parts = []
+    for block in message.get("content", []):
+        if "text" in block:
+            parts.append(block["text"])
+        elif "toolUse" in block:
+            parts.append(json.dumps(block["toolUse"].get("input", {}), ensure_ascii=False, default=str))
+        elif "toolResult" in block:
+            for item in block["toolResult"].get("content", []):
+                if "text" in item:
+                    parts.append(item["text"])
+                elif "json" in item:
+                    parts.append(json.dumps(item["json"], ensure_ascii=False, default=str))
+    return "\n".join(parts)
+
+
+def estimate_message_tokens(message: dict) -> int:
+    return estimate_tokens(message_text(message))
+
+
+def is_turn_start(message: dict) -> bool:
+    """Check whether a message is a user prompt (as opposed to a tool result message)"""
+    return message["role"] == "user" and not any("toolResult" in block for block in message["content"])
+
+
+def summarize_turn(turn: List[dict]) -> str:
+    """Extractive summary of a turn: the question and the beginning of the final answer"""
+    question = message_text(turn[0]).strip().replace("\n", " ")
+    answers = [m for m in turn[1:] if m["role"] == "assistant" and any("text" in b for b in m["content"])]
+    answer = " ".join(b["text"] for b in answers[-1]["content"] if "text" in b) if answers else ""
+    answer = answer.strip().replace("\n", " ")
+    tools = sorted({b["toolUse"]["name"] for m in turn for b in m["content"] if "toolUse" in b})
+    line = f"- 질문: {question[:200]}"
+    if tools:
+        line += f" (사용 도구: {', '.join(tools)})"
+    if answer:
+        line += f"\n  답변: {answer[:400]}"
+    return line
+
+
+class TokenBudgetConversationManager(SlidingWindowConversationManager):
+    """Keeps the estimated token count of a conversation under a budget
+
+    After each turn, bulky tool results of earlier turns are cut down to
+    `tool_result_tokens`, and while the history is still over `token_budget`
+    the oldest turns are folded into a rolling summary that is kept as the
+    first user/assistant message pair. The current turn is never touched, so
+    tool use/result pairs stay valid.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        tool_result_tokens: int = DEFAULT_TOOL_RESULT_TOKENS,
+        summary_tokens: int = DEFAULT_SUMMARY_TOKENS,
+        summarizer: Callable[[List[dict]], str] = summarize_turn,
+    ):
+        """
+        Args:
+            token_budget: Estimated tokens the history may use
+            tool_result_tokens: Estimated tokens kept of each tool result of an earlier turn
+            summary_tokens: Estimated tokens the rolling summary may use
+            summarizer: Turns the messages of one turn into a summary line
+        """
+        super().__init__(window_size=10**6)
+        self.token_budget = token_budget
+        self.tool_result_tokens = tool_result_tokens
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer
+        self.stats = {"elided_tool_results": 0, "summarized_turns": 0}
+
+    def apply_management(self, messages: list) -> None:
+        self._remove_dangling_messages(messages)
+        self._elide_tool_results(messages)
+        self._compact(messages, self.token_budget)
+
+    def reduce_context(self, messages: list, e: Optional[Exception] = None) -> None:
+        """Called on a context window overflow: compact down to half the budget, then fall back to trimming"""
+        before = len(messages)
+        self._compact(messages, self.token_budget // 2)
+        if len(messages) == before:
+            super().reduce_context(messages, e)
+
+    def _turn_starts(self, messages: list) -> List[int]:
+        start = 2 if self._has_summary(messages) else 0
+        return [i for i in range(start, len(messages)) if is_turn_start(messages[i])]
+
+    @staticmethod
+    def _has_summary(messages: list) -> bool:
+        return (
+            len(messages) >= 2
+            and messages[0]["role"] == "user"
+            and messages[0]["content"]
+            and messages[0]["content"][0].get("text", "").startswith(SUMMARY_MARKER)
+        )
+
+    def _elide_tool_results(self, messages: list):
+        starts = self._turn_starts(messages)
+        if not starts:
+            return
+        for message in messages[: starts[-1]]:
+            for block in message["content"]:
+                if "toolResult" not in block:
+                    continue
+                text = message_text({"content": [block]})
+                if ELIDED_MARKER in text or estimate_tokens(text) <= self.tool_result_tokens:
+                    continue
+                kept = truncate_to_tokens(text, self.tool_result_tokens)
+                elided = estimate_tokens(text[len(kept):])
+                block["toolResult"]["content"] = [{"text": f"{kept}\n{ELIDED_MARKER}: 약 {elided} 토큰]"}]
+                self.stats["elided_tool_results"] += 1
+
+    def _compact(self, messages: list, budget: int):
+        total = sum(estimate_message_tokens(m) for m in messages)
+        if total <= budget:
+            return
+        starts = self._turn_starts(messages)
+        if len(starts) < 2:
+            return  # only the current turn is left
+
+        summary_lines = []
+        if self._has_summary(messages):
+            body = messages[0]["content"][0]["text"][len(SUMMARY_MARKER):].strip()
+            summary_lines = [line if line.startswith("- ") else f"- {line}" for line in body.split("\n- ") if line]
+            total -= estimate_message_tokens(messages[0]) + estimate_message_tokens(messages[1])
+
+        # Fold whole turns, oldest first, until the remaining history fits
+        cut = starts[0]
+        for next_start in starts[1:]:
+            if total <= budget:
+                break
+            turn = messages[cut:next_start]
+            summary_lines.append(self.summarizer(turn))
+            total -= sum(estimate_message_tokens(m) for m in turn)
+            cut = next_start
+            self.stats["summarized_turns"] += 1
+
+        # Keep the summary itself bounded, dropping its oldest lines first
+        while len(summary_lines) > 1 and estimate_tokens("\n".join(summary_lines)) > self.summary_tokens:
+            summary_lines.pop(0)
+
+        summary = [
+            {"role": "user", "content": [{"text": f"{SUMMARY_MARKER}\n" + "\n".join(summary_lines)}]},
+            {"role": "assistant", "content": [{"text": SUMMARY_ACK}]},
+        ]
+        messages[:] = summary + messages[cut:]
+        logger.info(f"Conversation compacted: {self.stats['summarized_turns']} turns summarized so far")
+
+
+class SessionEntry:
+    """Conversation state of one session: a message history per agent and a conversation manager"""
+
+    def __init__(self, conversation_manager: ConversationManager):
+        self.histories = {}
+        self.conversation_manager = conversation_manager
+        self.last_used = time.time()
+        self.size = 0
+        self.leases = 0
+
+
+class ConversationStore:
+    """Per-session conversation histories with a total memory budget and LRU eviction
+
+    Histories are keyed by session id and by agent (namespace), so concurrent
+    users never share messages. When the estimated size of all histories
+    exceeds the budget, or a session stays idle longer than `idle_ttl`, the
+    least recently used sessions are evicted; with a spill directory they are
+    written to disk and transparently reloaded on the next access.
+    """
+
+    def __init__(
+        self,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+        idle_ttl: float = DEFAULT_IDLE_TTL,
+        spill_dir: Optional[str] = DEFAULT_SPILL_DIR,
+        manager_factory: Callable[[], ConversationManager] = lambda: SlidingWindowConversationManager(window_size=5),
+    ):
+        """
+        Args:
+            memory_budget: Total estimated bytes of history kept in memory
+            idle_ttl: Seconds after which an idle session is evicted
+            spill_dir: Directory where evicted sessions are persisted (None to drop them)
+            manager_factory: Creates the conversation manager of a new session
+        """
+        self.memory_budget = memory_budget
+        self.idle_ttl = idle_ttl
+        self.spill_dir = spill_dir
+        self.manager_factory = manager_factory
+        self._sessions: "OrderedDict[str, SessionEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._stats = {"evicted": 0, "spilled": 0, "restored": 0}
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def _spill_path(self, session_id: str) -> str:
+        safe_id = "".join(c for c in session_id if c.isalnum() or c in "-_")
+        return os.path.join(self.spill_dir, f"{safe_id}.pkl")
+
+    def _get_entry(self, session_id: str) -> SessionEntry:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            entry = SessionEntry(self.manager_factory())
+            if self.spill_dir and os.path.exists(self._spill_path(session_id)):
+                try:
+                    with open(self._spill_path(session_id), "rb") as f:
+                        spilled = pickle.load(f)
+                    entry.histories = spilled["histories"]
+                    entry.conversation_manager = spilled["conversation_manager"]
+                    os.remove(self._spill_path(session_id))
+                    entry.size = sum(estimate_size(m) for m in entry.histories.values())
+                    self._stats["restored"] += 1
+                    logger.info(f"Conversation restored from disk: {session_id}")
+                except Exception as e:
+                    logger.error(f"Failed to restore conversation {session_id}: {e}")
+            self._sessions[session_id] = entry
+        self._sessions.move_to_end(session_id)
+        entry.last_used = time.time()
+        return entry
+
+    def get_messages(self, session_id: str, namespace: str = "default") -> list:
+        """
+        Get the live message list of an agent in a session
+
+        The returned list is owned by the store; agents append to it in place.
+
+        Args:
+            session_id: Session (user) identifier
+            namespace: Agent the history belongs to (e.g. 'chembl')
+
+        Returns:
+            The message history list
+        """
+        with self._lock:
+            return self._get_entry(session_id).histories.setdefault(namespace, [])
+
+    def get_conversation_manager(self, session_id: str) -> ConversationManager:
+        """Get the conversation manager of a session"""
+        with self._lock:
+            return self._get_entry(session_id).conversation_manager
+
+    @contextmanager
+    def session(self, session_id: str):
+        """
+        Hold a session for the duration of a turn
+
+        A held session is never evicted, and the memory budget is enforced
+        once the turn releases it.
+        """
+        with self._lock:
+            self._get_entry(session_id).leases += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                entry = self._sessions.get(session_id)
+                if entry is not None:
+                    entry.leases -= 1
+                    entry.last_used = time.time()
+                    entry.size = sum(estimate_size(m) for m in entry.histories.values())
+            self.enforce_budget()
+
+    def reset(self, session_id: str):
+        """Clear all history of a session, including any spilled copy"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            if self.spill_dir and os.path.exists(self._spill_path(session_id)):
+                os.remove(self._spill_path(session_id))
+        logger.info(f"Conversation reset: {session_id}")
+
+    def enforce_budget(self):
+        """Evict idle sessions and least recently used sessions until the memory budget is met"""
+        now = time.time()
+        with self._lock:
+            for session_id, entry in list(self._sessions.items()):
+                if entry.leases == 0 and now - entry.last_used > self.idle_ttl:
+                    self._evict(session_id)
+
+            total = sum(entry.size for entry in self._sessions.values())
+            for session_id, entry in list(self._sessions.items()):  # oldest first
+                if total <= self.memory_budget:
+                    break
+                if entry.leases > 0:
+                    continue
+                total -= entry.size
+                self._evict(session_id)
+
+    def _evict(self, session_id: str):
+        entry = self._sessions.pop(session_id)
+        self._stats["evicted"] += 1
+        if self.spill_dir and any(entry.histories.values()):
+            try:
+                with open(self._spill_path(session_id), "wb") as f:
+                    pickle.dump(
+                        {"histories": entry.histories, "conversation_manager": entry.conversation_manager}, f
+                    )
+                self._stats["spilled"] += 1
+            except Exception as e:
+                logger.error(f"Failed to spill conversation {session_id}: {e}")
+        logger.info(f"Conversation evicted: {session_id} ({entry.size} bytes)")
+
+    def get_stats(self) -> dict:
+        """Get session count, estimated memory use and eviction counters"""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": sum(entry.size for entry in self._sessions.values()),
+                "memory_budget": self.memory_budget,
+                **self._stats,
+            }
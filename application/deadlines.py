@@ -0,0 +1,153 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "600"))  # seconds a whole turn may take
+MAX_TRACKED = 256  # recent requests kept for lookups from worker threads
+
+
+class RequestAbandoned(Exception):
+    """Raised by work that continues after its request timed out or was cancelled"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"request {reason}")
+        self.reason = reason
+
+
+class Deadline:
+    """Time budget and cancellation flag of one user request
+
+    Shared by every thread working on the request (the agent, research
+    branches, Bedrock streams and MCP tool calls), which check it before
+    starting more work.
+    """
+
+    def __init__(self, timeout: Optional[float] = REQUEST_TIMEOUT, parent: Optional["Deadline"] = None):
+        """
+        Args:
+            timeout: Seconds from now until the deadline (None for no limit)
+            parent: Deadline of the enclosing request; this one is over whenever the parent is
+        """
+        self.request_id = uuid.uuid4().hex
+        self.expires_at = time.monotonic() + timeout if timeout else None
+        self.parent = parent
+        self._cancelled = threading.Event()
+        self._reason = None
+
+    def cancel(self, reason: str = "cancelled"):
+        """Cancel the request, e.g. because a newer request superseded it"""
+        if not self._cancelled.is_set():
+            self._reason = reason
+            self._cancelled.set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (0 once cancelled), or None without a time limit"""
+        if self._cancelled.is_set():
+            return 0.0
+        remaining = None if self.expires_at is None else max(0.0, self.expires_at - time.monotonic())
+        if self.parent is not None:
+            parent_remaining = self.parent.remaining()
+            if parent_remaining is not None:
+                remaining = parent_remaining if remaining is None else min(remaining, parent_remaining)
+        return remaining
+
+    def expired(self) -> bool:
+        return self.remaining() == 0.0
+
+    @property
+    def reason(self) -> Optional[str]:
+        """'superseded'/'cancelled' after cancel(), 'timeout' past the deadline, None while running"""
+        if self.parent is not None and self.parent.reason is not None:
+            return self.parent.reason
+        if self._cancelled.is_set():
+            return self._reason
+        if self.expires_at is not None and time.monotonic() >= self.expires_at:
+            return "timeout"
+        return None
+
+    def check(self, stage: str):
+        """Raise RequestAbandoned (and count it for `stage`) if the request is over"""
+        reason = self.reason
+        if reason is not None:
+            record(stage, reason)
+            raise RequestAbandoned(reason)
+
+
+current_deadline: contextvars.ContextVar = contextvars.ContextVar("current_deadline", default=None)
+
+_deadlines: "OrderedDict[str, Deadline]" = OrderedDict()
+_stats: Dict[str, Dict[str, int]] = {}
+_lock = threading.Lock()
+
+
+def start(timeout: Optional[float] = REQUEST_TIMEOUT, parent: Optional[Deadline] = None) -> Deadline:
+    """Create the deadline of a new request (or of a part of one) and make it current in this context"""
+    deadline = Deadline(timeout, parent)
+    with _lock:
+        _deadlines[deadline.request_id] = deadline
+        while len(_deadlines) > MAX_TRACKED:
+            _deadlines.popitem(last=False)
+    current_deadline.set(deadline)
+    return deadline
+
+
+def current() -> Optional[Deadline]:
+    return current_deadline.get()
+
+
+def abandoned_by(error: BaseException) -> Optional[RequestAbandoned]:
+    """
+    Find out whether an error means the current request is over
+
+    Strands wraps errors raised inside the model stream (e.g. EventLoopException),
+    so the RequestAbandoned may sit in the error's cause chain.
+
+    Returns:
+        The RequestAbandoned behind the error, one for the current deadline if that
+        is over, or None if the error is unrelated to the request ending
+    """
+    for _ in range(8):  # cause chains are short; the bound guards against cycles
+        if error is None:
+            break
+        if isinstance(error, RequestAbandoned):
+            return error
+        error = error.__cause__ or error.__context__
+    deadline = current()
+    if deadline is not None and deadline.reason is not None:
+        return RequestAbandoned(deadline.reason)
+    return None
+
+
+def lookup(request_id: Optional[str]) -> Optional[Deadline]:
+    """Find a request's deadline from a thread that did not inherit the context (e.g. a tool call)"""
+    if not request_id:
+        return None
+    with _lock:
+        return _deadlines.get(request_id)
+
+
+def record(stage: str, reason: str):
+    """
+    Count work that was stopped because its request was over
+
+    Args:
+        stage: Where it was stopped ('turn', 'agent', 'branch', 'bedrock', 'mcp')
+        reason: 'timeout', 'superseded' or 'cancelled'
+    """
+    with _lock:
+        counters = _stats.setdefault(stage, {})
+        counters[reason] = counters.get(reason, 0) + 1
+    logger.info(f"abandoned work: {stage} ({reason})")
+
+
+def get_stats() -> dict:
+    """Get the counts of stopped work per stage and reason"""
+    with _lock:
+        return {stage: dict(counters) for stage, counters in _stats.items()}
@@ -202,6 +202,8 @@ def get_model_info(model_name):
         models = claude_3_5_haiku_models
     elif model_name == "Nova Premier":
         models = nova_premier
+    elif model_name == "Claude 4 Sonnet":
+        models = claude_4_sonnet_models
 
     return models
 
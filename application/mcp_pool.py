@@ -0,0 +1,379 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from typing import Callable, Dict, List, Optional
+
+import anyio
+from strands.tools.mcp import MCPClient, MCPTransport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "1"))
+DEFAULT_IDLE_TIMEOUT = float(os.getenv("MCP_POOL_IDLE_TIMEOUT", "600"))  # seconds
+DEFAULT_HEALTH_CHECK_INTERVAL = float(os.getenv("MCP_POOL_HEALTH_CHECK_INTERVAL", "30"))  # seconds
+PING_TIMEOUT = 10  # seconds
+TOOLS_LIST_CHANGED = "notifications/tools/list_changed"
+
+
+def get_pool_size(server_name: str, default: int = DEFAULT_POOL_SIZE) -> int:
+    """
+    Resolve the pool size for a server type from the environment
+
+    Args:
+        server_name: Name of the MCP server (e.g. 'tavily', 'chembl')
+        default: Size used when MCP_POOL_SIZE_<NAME> is not set
+
+    Returns:
+        Number of warm client sessions to keep for the server
+    """
+    value = os.getenv(f"MCP_POOL_SIZE_{server_name.upper()}")
+    if value is None:
+        return default
+    try:
+        return max(1, int(value))
+    except ValueError:
+        logger.warning(f"Invalid MCP_POOL_SIZE_{server_name.upper()}: {value}, using {default}")
+        return default
+
+
+def watch_tools_list_changed(
+    transport_callable: Callable[[], MCPTransport], on_list_changed: Callable[[], None]
+) -> Callable[[], MCPTransport]:
+    """
+    Wrap an MCP transport so `tools/list_changed` notifications can be observed
+
+    MCPClient does not expose the session's notification handler, so the
+    incoming stream is relayed through a memory stream and inspected on the way.
+
+    Args:
+        transport_callable: Callable returning the original transport (e.g. stdio_client)
+        on_list_changed: Callback invoked when the server announces a new tool list
+
+    Returns:
+        A transport callable usable with MCPClient
+    """
+
+    @asynccontextmanager
+    async def transport():
+        async with transport_callable() as (read_stream, write_stream, *_):
+            relay_send, relay_receive = anyio.create_memory_object_stream(0)
+
+            async def relay():
+                async with relay_send:
+                    async for message in read_stream:
+                        root = getattr(getattr(message, "message", None), "root", None)
+                        if getattr(root, "method", None) == TOOLS_LIST_CHANGED:
+                            logger.info("MCP server announced a changed tool list")
+                            on_list_changed()
+                        await relay_send.send(message)
+
+            async with anyio.create_task_group() as task_group:
+                task_group.start_soon(relay)
+                try:
+                    yield relay_receive, write_stream
+                finally:
+                    task_group.cancel_scope.cancel()
+
+    return transport
+
+
+class PooledClient:
+    """A single warm MCP client session and its bookkeeping"""
+
+    def __init__(self, client: MCPClient):
+        self.client = client
+        self.created_at = time.time()
+        self.last_used = self.created_at
+
+    def is_alive(self) -> bool:
+        """Check whether the background session thread of the client is still running"""
+        return self.client._is_session_active()
+
+    def ping(self, timeout: float = PING_TIMEOUT) -> bool:
+        """
+        Send an MCP ping over the live session
+
+        Args:
+            timeout: Seconds to wait for the pong
+
+        Returns:
+            True if the server answered in time
+        """
+        if not self.is_alive():
+            return False
+        try:
+            # MCPClient has no public ping, so schedule it on the client's own loop
+            future = asyncio.run_coroutine_threadsafe(
+                self.client._background_thread_session.send_ping(),
+                self.client._background_thread_event_loop,
+            )
+            future.result(timeout=timeout)
+            return True
+        except Exception as e:
+            logger.warning(f"MCP ping failed: {e}")
+            return False
+
+    def stop(self):
+        """Stop the client session, ignoring errors from an already dead server"""
+        if not self.is_alive():
+            # The background loop is gone; MCPClient.stop would wait forever on it
+            return
+        try:
+            self.client.stop(None, None, None)
+        except Exception as e:
+            logger.debug(f"Error while stopping MCP client: {e}")
+
+
+class MCPServerPool:
+    """Keeps up to `size` warm client sessions for one MCP server type"""
+
+    def __init__(self, name: str, factory: Callable[[], MCPClient], size: int = DEFAULT_POOL_SIZE):
+        self.name = name
+        self.factory = factory
+        self.size = max(1, size)
+        self._slots: List[PooledClient] = []
+        self._next = 0
+        self._leases = 0
+        self._lock = threading.RLock()
+        self._stats = {"spawned": 0, "respawned": 0, "reaped": 0, "health_failures": 0}
+        self._listeners: List[Callable[[str], None]] = []
+
+    def add_restart_listener(self, listener: Callable[[str], None]):
+        """Register a callback invoked with the server name whenever a dead session is discarded"""
+        self._listeners.append(listener)
+
+    def _notify_restart(self):
+        for listener in self._listeners:
+            try:
+                listener(self.name)
+            except Exception as e:
+                logger.error(f"MCP restart listener failed for '{self.name}': {e}")
+
+    def _spawn(self) -> PooledClient:
+        start = time.time()
+        client = self.factory()
+        client.start()
+        self._stats["spawned"] += 1
+        logger.info(f"MCP server '{self.name}' spawned in {time.time() - start:.2f}s")
+        return PooledClient(client)
+
+    def get(self) -> MCPClient:
+        """
+        Get a warm client session, spawning or respawning one if needed
+
+        Sessions are shared: an MCP session multiplexes concurrent requests,
+        so the pool round-robins callers over its slots instead of handing
+        out exclusive leases.
+
+        Returns:
+            A started MCPClient instance
+        """
+        with self._lock:
+            # Drop dead sessions so they get respawned below
+            for slot in [s for s in self._slots if not s.is_alive()]:
+                logger.warning(f"MCP server '{self.name}' session died, respawning")
+                slot.stop()
+                self._slots.remove(slot)
+                self._stats["respawned"] += 1
+                self._notify_restart()
+
+            if len(self._slots) < self.size:
+                slot = self._spawn()
+                self._slots.append(slot)
+            else:
+                slot = self._slots[self._next % len(self._slots)]
+                self._next += 1
+
+            slot.last_used = time.time()
+            return slot.client
+
+    def warm(self):
+        """Spawn sessions until the pool is full"""
+        with self._lock:
+            while len(self._slots) < self.size:
+                self._slots.append(self._spawn())
+
+    @contextmanager
+    def lease(self):
+        """Mark the server as in use so its sessions are not reaped mid-turn"""
+        with self._lock:
+            self._leases += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._leases -= 1
+                now = time.time()
+                for slot in self._slots:
+                    slot.last_used = max(slot.last_used, now)
+
+    def check_health(self):
+        """Ping every session and discard the ones that do not answer"""
+        with self._lock:
+            slots = list(self._slots)
+        for slot in slots:
+            if slot.ping():
+                continue
+            self._stats["health_failures"] += 1
+            logger.warning(f"MCP server '{self.name}' failed health check, discarding session")
+            with self._lock:
+                if slot in self._slots:
+                    self._slots.remove(slot)
+            slot.stop()
+            self._notify_restart()
+
+        with self._lock:
+            # Keep leased servers at full strength so the current turn does not pay for a respawn
+            if self._leases > 0:
+                while len(self._slots) < self.size:
+                    self._slots.append(self._spawn())
+                    self._stats["respawned"] += 1
+
+    def reap_idle(self, idle_timeout: float):
+        """
+        Stop sessions that have not been used for `idle_timeout` seconds
+
+        Args:
+            idle_timeout: Idle time in seconds after which a session is stopped
+        """
+        now = time.time()
+        with self._lock:
+            if self._leases > 0:
+                return
+            idle = [s for s in self._slots if now - s.last_used > idle_timeout]
+            for slot in idle:
+                self._slots.remove(slot)
+        for slot in idle:
+            logger.info(f"Reaping idle MCP server '{self.name}' session")
+            slot.stop()
+            self._stats["reaped"] += 1
+
+    def shutdown(self):
+        """Stop all sessions of this server"""
+        with self._lock:
+            slots, self._slots = self._slots, []
+        for slot in slots:
+            slot.stop()
+
+    def get_status(self) -> dict:
+        """Get status information for this server's sessions"""
+        with self._lock:
+            return {
+                "size": self.size,
+                "alive": sum(1 for s in self._slots if s.is_alive()),
+                "leases": self._leases,
+                "last_used": max((s.last_used for s in self._slots), default=None),
+                **self._stats,
+            }
+
+
+class MCPClientPool:
+    """Process-wide pool of warm MCP client sessions shared across turns and reruns"""
+
+    def __init__(
+        self,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+    ):
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self._servers: Dict[str, MCPServerPool] = {}
+        self._maintenance_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], MCPClient], size: Optional[int] = None) -> MCPServerPool:
+        """
+        Register an MCP server type with the pool
+
+        Args:
+            name: Server type name used by agents (e.g. 'chembl')
+            factory: Callable returning a new, not yet started MCPClient
+            size: Number of warm sessions to keep (default: MCP_POOL_SIZE_<NAME> or MCP_POOL_SIZE)
+
+        Returns:
+            The per-server pool
+        """
+        server = MCPServerPool(name, factory, size if size is not None else get_pool_size(name))
+        self._servers[name] = server
+        return server
+
+    def has_server(self, name: str) -> bool:
+        return name in self._servers
+
+    def get_server(self, name: str) -> Optional[MCPServerPool]:
+        return self._servers.get(name)
+
+    def get(self, name: str) -> Optional[MCPClient]:
+        """
+        Get a warm client session for a server type
+
+        Args:
+            name: Server type name
+
+        Returns:
+            Started MCPClient instance or None if the server is not registered
+        """
+        server = self._servers.get(name)
+        if server is None:
+            return None
+        self._ensure_maintenance_thread()
+        return server.get()
+
+    def warm(self, *names: str):
+        """Spawn sessions for the given server types (all registered servers if none given)"""
+        for name in names or list(self._servers):
+            server = self._servers.get(name)
+            if server is None:
+                continue
+            try:
+                server.warm()
+            except Exception as e:
+                logger.error(f"Failed to warm MCP server '{name}': {e}")
+        self._ensure_maintenance_thread()
+
+    @contextmanager
+    def lease(self, *names: str):
+        """
+        Hold the given server types for the duration of a turn
+
+        Args:
+            names: Server type names the turn will use
+        """
+        with ExitStack() as stack:
+            for name in names:
+                if name in self._servers:
+                    stack.enter_context(self._servers[name].lease())
+            yield self
+
+    def get_status(self) -> dict:
+        """Get status information for every registered server"""
+        return {name: server.get_status() for name, server in self._servers.items()}
+
+    def shutdown(self):
+        """Stop the maintenance thread and every session"""
+        self._stop_event.set()
+        for server in self._servers.values():
+            server.shutdown()
+
+    def _ensure_maintenance_thread(self):
+        with self._lock:
+            if self._maintenance_thread is not None and self._maintenance_thread.is_alive():
+                return
+            self._maintenance_thread = threading.Thread(
+                target=self._maintenance_loop, name="mcp-pool-maintenance", daemon=True
+            )
+            self._maintenance_thread.start()
+
+    def _maintenance_loop(self):
+        while not self._stop_event.wait(self.health_check_interval):
+            for server in list(self._servers.values()):
+                try:
+                    server.reap_idle(self.idle_timeout)
+                    server.check_health()
+                except Exception as e:
+                    logger.error(f"MCP pool maintenance failed for '{server.name}': {e}")
+
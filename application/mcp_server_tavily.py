@@ -1,12 +1,27 @@
 from mcp.server.fastmcp import FastMCP
+import asyncio
+import hashlib
 import logging
+import random
+import re
 import sys
-from typing import List, Literal, Optional
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import List, Literal, Optional, Union
 from pydantic import BaseModel, Field, field_validator
-from tavily import TavilyClient, InvalidAPIKeyError, UsageLimitExceededError
+from tavily import InvalidAPIKeyError, UsageLimitExceededError, BadRequestError
+from tavily.errors import ForbiddenError
+import httpx
 import json
 import os
 from dotenv import load_dotenv
+from search_cache import SearchCache, TOPIC_TTLS, make_key
+
+try:
+    import fcntl
+except ImportError:  # Windows: the ledger file is not locked across server processes
+    fcntl = None
 
 # Configure logging
 logging.basicConfig(
@@ -36,8 +51,307 @@ except Exception as e:
     err_msg = f"Error: {str(e)}"
     logger.error(f"{err_msg}")
 
-# Initialize Tavily client
-client = TavilyClient(api_key=api_key)
+# Tavily API client
+# TavilyClient blocks the event loop for the whole request and AsyncTavilyClient opens a
+# new connection per request, so searches go through one shared async HTTP client: its
+# keep-alive pool reuses TLS connections and concurrent tool calls overlap their round trips.
+TAVILY_API_URL = "https://api.tavily.com"
+TAVILY_TIMEOUT = float(os.getenv("TAVILY_TIMEOUT", "60"))  # seconds per request
+TAVILY_MAX_CONCURRENCY = int(os.getenv("TAVILY_MAX_CONCURRENCY", "8"))  # upstream requests in flight
+
+http_client = httpx.AsyncClient(
+    base_url=TAVILY_API_URL,
+    headers={"Authorization": f"Bearer {api_key}"},
+    timeout=TAVILY_TIMEOUT,
+    limits=httpx.Limits(max_connections=TAVILY_MAX_CONCURRENCY, max_keepalive_connections=TAVILY_MAX_CONCURRENCY),
+    proxy=os.getenv("TAVILY_HTTPS_PROXY") or None,
+)
+_request_slots: Optional[asyncio.Semaphore] = None
+
+# Client-side rate limiting and credit accounting
+# Bursts from parallel agents are queued and spaced out instead of hitting the API's
+# limit, and every upstream search is charged against a monthly credit budget.
+TAVILY_RATE_PER_MINUTE = float(os.getenv("TAVILY_RATE_PER_MINUTE", "60"))  # sustained request rate, 0 for no limit
+TAVILY_BURST = int(os.getenv("TAVILY_BURST", "10"))  # requests sent back to back before spacing starts
+TAVILY_MAX_RETRIES = int(os.getenv("TAVILY_MAX_RETRIES", "2"))  # retries of a 429 that carries Retry-After
+TAVILY_MAX_RETRY_AFTER = float(os.getenv("TAVILY_MAX_RETRY_AFTER", "30"))  # longer waits fail instead
+TAVILY_MONTHLY_CREDITS = int(os.getenv("TAVILY_MONTHLY_CREDITS", "1000"))  # 0 for no budget
+TAVILY_QUOTA_PATH = os.getenv(
+    "TAVILY_QUOTA_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "tavily_quota.json")
+)
+CREDITS_PER_DEPTH = {"basic": 1, "advanced": 2}
+
+class TokenBucket:
+    """Token bucket rate limiter; callers wait in arrival order until a token is available"""
+
+    def __init__(self, rate_per_second: float, capacity: int):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self) -> float:
+        """Take one token, waiting for it if the bucket is empty; returns the seconds waited"""
+        if self.rate <= 0:
+            return 0.0
+        if self._lock is None:  # created on the server's event loop
+            self._lock = asyncio.Lock()
+        start = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return now - start
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class QuotaLedger:
+    """Monthly Tavily credit ledger, persisted to a JSON file
+
+    Credits are reserved before a request is sent, so concurrent searches cannot
+    overspend the budget together, and refunded if the request fails. Every
+    pooled session is a separate server process, so each change re-reads the
+    file and writes it back under an exclusive file lock.
+    """
+
+    def __init__(self, monthly_credits: int = TAVILY_MONTHLY_CREDITS, path: Optional[str] = TAVILY_QUOTA_PATH):
+        self.monthly_credits = monthly_credits
+        self.path = path
+        self.periods = {}
+
+    @contextmanager
+    def _locked(self, write: bool = True):
+        """Hold the ledger file lock with the periods freshly read, writing them back afterwards"""
+        lock_file = None
+        if self.path:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                lock_file = open(f"{self.path}.lock", "a")
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            except OSError as e:
+                logger.error(f"Failed to lock the quota ledger {self.path}: {e}")
+        try:
+            self._load()
+            yield
+            if write:
+                self._write()
+        finally:
+            if lock_file is not None:
+                lock_file.close()  # releases the lock
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.periods = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to read the quota ledger {self.path}: {e}")
+
+    def _write(self):
+        if not self.path:
+            return
+        try:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.periods, f)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            logger.error(f"Failed to write the quota ledger {self.path}: {e}")
+
+    @staticmethod
+    def current_period() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m")
+
+    def _period(self, key: Optional[str] = None) -> dict:
+        return self.periods.setdefault(
+            key or self.current_period(), {"credits": 0, "requests": {}, "credits_by_depth": {}, "waited_seconds": 0.0}
+        )
+
+    def remaining(self) -> Optional[int]:
+        if not self.monthly_credits:
+            return None
+        return max(0, self.monthly_credits - self._period()["credits"])
+
+    def reserve(self, depth: str) -> tuple:
+        """
+        Reserve the credits of one search
+
+        Returns:
+            The period (month) the credits were taken from and the credits, to pass to refund()
+
+        Raises:
+            UsageLimitExceededError: When the budget is spent
+        """
+        cost = CREDITS_PER_DEPTH.get(depth, 1)
+        with self._locked():
+            remaining = self.remaining()
+            if remaining is not None and remaining < cost:
+                raise UsageLimitExceededError(
+                    f"Monthly Tavily credit budget exhausted ({remaining} of {self.monthly_credits} left, "
+                    f"a {depth} search costs {cost})"
+                )
+            key = self.current_period()
+            period = self._period(key)
+            period["credits"] += cost
+            period["requests"][depth] = period["requests"].get(depth, 0) + 1
+            period["credits_by_depth"][depth] = period["credits_by_depth"].get(depth, 0) + cost
+        return key, cost
+
+    def refund(self, key: str, depth: str, cost: int):
+        """Give back the credits of a search that did not go through to the period they were reserved in"""
+        with self._locked():
+            period = self._period(key)
+            period["credits"] = max(0, period["credits"] - cost)
+            period["requests"][depth] = max(0, period["requests"].get(depth, 0) - 1)
+            period["credits_by_depth"][depth] = max(0, period["credits_by_depth"].get(depth, 0) - cost)
+
+    def record_wait(self, seconds: float):
+        with self._locked():
+            period = self._period()
+            period["waited_seconds"] = round(period["waited_seconds"] + seconds, 3)
+
+    def get_budget(self) -> dict:
+        """Credits spent and left this month, with the searches each depth still affords"""
+        with self._locked(write=False):
+            remaining = self.remaining()
+            period = dict(self._period())
+        return {
+            "period": self.current_period(),
+            "monthly_credits": self.monthly_credits or None,
+            **period,
+            "remaining_credits": remaining,
+            "affordable_searches": {
+                depth: (remaining // cost if remaining is not None else None)
+                for depth, cost in CREDITS_PER_DEPTH.items()
+            },
+        }
+
+rate_limiter = TokenBucket(TAVILY_RATE_PER_MINUTE / 60, TAVILY_BURST)
+quota = QuotaLedger()
+
+async def tavily_search(**params) -> dict:
+    """
+    Call the Tavily search API without blocking the event loop
+
+    The request waits for the rate limiter, is charged to the credit ledger, and
+    is retried only when a 429 names a short Retry-After; a 429 without one means
+    the plan's usage limit is reached and fails at once.
+
+    Args:
+        **params: Search parameters of the Tavily API (query, search_depth, topic, days, max_results,
+            include_answer, include_domains, exclude_domains); None values are left out
+
+    Returns:
+        The API response
+
+    Raises:
+        The tavily package's errors for rejected requests (UsageLimitExceededError also when the
+        monthly budget is spent), httpx errors for transport failures
+    """
+    global _request_slots
+    if _request_slots is None:  # created on the server's event loop
+        _request_slots = asyncio.Semaphore(TAVILY_MAX_CONCURRENCY)
+    payload = {key: value for key, value in params.items() if value is not None}
+    depth = payload.get("search_depth", "basic")
+    period, cost = quota.reserve(depth)
+    charged = False
+    try:
+        for attempt in range(TAVILY_MAX_RETRIES + 1):
+            waited = await rate_limiter.acquire()
+            if waited:
+                quota.record_wait(waited)
+            async with _request_slots:
+                response = await http_client.post("/search", json=payload)
+            if response.status_code != 429 or attempt == TAVILY_MAX_RETRIES:
+                break
+            try:
+                delay = float(response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                break  # usage limit rather than throttling; retrying only burns time on an exhausted key
+            if delay > TAVILY_MAX_RETRY_AFTER:
+                break
+            logger.warning(f"Tavily rate limited, retry {attempt + 1}/{TAVILY_MAX_RETRIES} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        charged = response.status_code == 200
+    finally:
+        if not charged:
+            quota.refund(period, depth, cost)
+
+    if response.status_code != 200:
+        try:
+            detail = response.json().get("detail", {}).get("error")
+        except Exception:
+            detail = None
+        if response.status_code == 429:
+            raise UsageLimitExceededError(f"Tavily usage limit or rate limit exceeded: {detail or 'HTTP 429'}")
+        if response.status_code == 401:
+            raise InvalidAPIKeyError(detail)
+        if response.status_code in (403, 432, 433):
+            raise ForbiddenError(detail)
+        if response.status_code == 400:
+            raise BadRequestError(detail)
+        response.raise_for_status()
+    return response.json()
+
+# Responses shared by every client of this server; identical concurrent searches make one API call
+search_cache = SearchCache()
+
+async def cached_search(tool: str, ttl_topic: str, **params) -> dict:
+    """
+    Search through the response cache
+
+    Args:
+        tool: Tool the search is made for (part of the cache key)
+        ttl_topic: 'general', 'answer' or 'news', selecting how long the response is cached
+        **params: Parameters of tavily_search()
+
+    Returns:
+        The API response (a copy the caller may modify)
+    """
+    key = make_key(
+        tool,
+        params["query"],
+        params["max_results"],
+        params.get("search_depth"),
+        params.get("days"),
+        params.get("include_domains"),
+        params.get("exclude_domains"),
+    )
+    return await search_cache.get_or_fetch(key, TOPIC_TTLS[ttl_topic], lambda: tavily_search(**params))
+
+@mcp.resource("tavily://quota", mime_type="application/json")
+def quota_budget() -> str:
+    """Tavily credits spent and left this month"""
+    return json.dumps(quota.get_budget())
+
+@mcp.tool()
+async def tavily_quota_status() -> str:
+    """Reports the Tavily search credits left this month. Check it before 'advanced' searches
+    (2 credits each, 'basic' costs 1) and prefer 'basic' when few credits are left.
+    
+    Returns:
+        Credits left, spent per search depth, and how many basic/advanced searches the budget still affords
+    """
+    budget = quota.get_budget()
+    if budget["remaining_credits"] is None:
+        return f"No credit budget configured; {budget['credits']} credits used in {budget['period']}"
+    return "\n".join([
+        f"Period: {budget['period']}",
+        f"Credits left: {budget['remaining_credits']} of {budget['monthly_credits']}",
+        f"Credits spent by depth: {json.dumps(budget['credits_by_depth'])}",
+        f"Searches still affordable: {budget['affordable_searches']['basic']} basic "
+        f"or {budget['affordable_searches']['advanced']} advanced",
+    ])
+
+@mcp.resource("tavily://cache/stats", mime_type="application/json")
+def cache_stats() -> str:
+    """Hit rate and counters of the search response cache"""
+    return json.dumps(search_cache.get_stats())
 
 # Base model for search parameters
 class SearchBase(BaseModel):
@@ -83,9 +397,82 @@ class SearchBase(BaseModel):
                 return [v]  # Single domain
         return []
 
-def format_results(response: dict) -> str:
-    """Format Tavily search results into a readable string."""
+# Character budgets of the result detail levels: (per result content, whole output); None is unlimited
+DETAIL_BUDGETS = {
+    "brief": (300, 2000),
+    "standard": (800, 6000),
+    "full": (None, None),
+}
+SHINGLE_WORDS = 5  # words per shingle of the near-duplicate check
+MINHASH_PERMUTATIONS = 64
+NEAR_DUPLICATE_THRESHOLD = 0.6  # estimated Jaccard similarity above which two results are the same text
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(0)
+_MINHASH_PARAMS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(MINHASH_PERMUTATIONS)
+]
+
+def minhash_signature(text: str) -> Optional[List[int]]:
+    """MinHash signature of a text's word shingles, or None if it is too short to compare"""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < SHINGLE_WORDS:
+        return None
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big") for shingle in shingles
+    ]
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _MINHASH_PARAMS]
+
+def drop_near_duplicates(results: List[dict]) -> List[dict]:
+    """
+    Remove results whose content repeats an earlier result (e.g. syndicated articles)
+
+    Args:
+        results: Results in rank order
+
+    Returns:
+        The kept results; each lists the URLs of its dropped copies under 'duplicate_urls'
+    """
+    kept = []
+    for result in results:
+        signature = minhash_signature(result.get("content") or "")
+        original = None
+        if signature is not None:
+            for other, other_signature in kept:
+                if other_signature is None:
+                    continue
+                similarity = sum(x == y for x, y in zip(signature, other_signature)) / MINHASH_PERMUTATIONS
+                if similarity >= NEAR_DUPLICATE_THRESHOLD:
+                    original = other
+                    break
+        if original is None:
+            kept.append(({**result, "duplicate_urls": []}, signature))
+        else:
+            original["duplicate_urls"].append(result["url"])
+    return [result for result, _ in kept]
+
+def truncate(text: str, limit: Optional[int]) -> str:
+    """Shorten text to at most `limit` characters, cutting at a sentence or word boundary"""
+    text = " ".join((text or "").split())
+    if limit is None or len(text) <= limit:
+        return text
+    cut = text[:limit]
+    boundary = cut.rfind(". ")
+    if boundary < limit // 2:
+        boundary = cut.rfind(" ")
+    return cut[: boundary + 1 if boundary > 0 else limit].rstrip() + " …"
+
+def format_results(response: dict, detail: str = "full") -> str:
+    """Format Tavily search results into a readable string.
+
+    The 'full' detail level prints every result as returned. 'standard' and 'brief'
+    drop near-duplicate results and the separate source list of answers, and cut
+    the content to the character budgets of DETAIL_BUDGETS.
+    """
     output = []
+    compact = detail != "full"
+    result_budget, total_budget = DETAIL_BUDGETS.get(detail, DETAIL_BUDGETS["standard"])
+    results = drop_near_duplicates(response["results"]) if compact else response["results"]
     
     # Add domain filter information if present
     if response.get("included_domains") or response.get("excluded_domains"):
@@ -100,19 +487,30 @@ def format_results(response: dict) -> str:
     
     if response.get("answer"):
         output.append(f"Answer: {response['answer']}")
-        output.append("\nSources:")
-        # Add immediate source references for the answer
-        for result in response["results"]:
-            output.append(f"- {result['title']}: {result['url']}")
+        if not compact:
+            output.append("\nSources:")
+            # Add immediate source references for the answer
+            for result in results:
+                output.append(f"- {result['title']}: {result['url']}")
         output.append("")  # Empty line for separation
     
     output.append("Detailed Results:")
-    for result in response["results"]:
-        output.append(f"\nTitle: {result['title']}")
-        output.append(f"URL: {result['url']}")
-        output.append(f"Content: {result['content']}")
+    used = sum(len(line) + 1 for line in output)
+    for shown, result in enumerate(results):
+        entry = [f"\nTitle: {result['title']}", f"URL: {result['url']}"]
+        entry.append(f"Content: {truncate(result['content'], result_budget) if compact else result['content']}")
         if result.get("published_date"):
-            output.append(f"Published: {result['published_date']}")
+            entry.append(f"Published: {result['published_date']}")
+        if result.get("queries"):
+            entry.append(f"Matched queries: {'; '.join(result['queries'])}")
+        if result.get("duplicate_urls"):
+            entry.append(f"Also at: {', '.join(result['duplicate_urls'])}")
+        size = sum(len(line) + 1 for line in entry)
+        if total_budget is not None and shown and used + size > total_budget:
+            output.append(f"\n({len(results) - shown} more results omitted; use detail='full' to see them)")
+            break
+        output.extend(entry)
+        used += size
         
     return "\n".join(output)
 
@@ -122,7 +520,8 @@ async def tavily_web_search(
     max_results: int = 5, 
     search_depth: Literal["basic", "advanced"] = "basic",
     include_domains: Optional[List[str]] = None,
-    exclude_domains: Optional[List[str]] = None
+    exclude_domains: Optional[List[str]] = None,
+    detail: Literal["brief", "standard", "full"] = "standard"
 ) -> str:
     """Performs a comprehensive web search using Tavily's AI-powered search engine.
     Excels at extracting and summarizing relevant content from web pages, making it ideal for research,
@@ -134,6 +533,7 @@ async def tavily_web_search(
         search_depth: Depth of search - 'basic' or 'advanced' (default: basic)
         include_domains: List of domains to specifically include in results (optional)
         exclude_domains: List of domains to specifically exclude from results (optional)
+        detail: Result detail - 'brief' (~2k chars), 'standard' (~6k chars, default) or 'full' (untruncated)
         
     Returns:
         Formatted search results text
@@ -143,7 +543,9 @@ async def tavily_web_search(
         include_domains_list = SearchBase.parse_domains_list(include_domains) if include_domains else []
         exclude_domains_list = SearchBase.parse_domains_list(exclude_domains) if exclude_domains else []
         
-        response = client.search(
+        response = await cached_search(
+            "tavily_web_search",
+            "general",
             query=query,
             max_results=max_results,
             search_depth=search_depth,
@@ -157,7 +559,7 @@ async def tavily_web_search(
         if exclude_domains_list:
             response["excluded_domains"] = exclude_domains_list
             
-        return format_results(response)
+        return format_results(response, detail)
     except (InvalidAPIKeyError, UsageLimitExceededError) as e:
         error_msg = f"Tavily API error: {str(e)}"
         logger.error(error_msg)
@@ -173,7 +575,8 @@ async def tavily_answer_search(
     max_results: int = 5, 
     search_depth: Literal["basic", "advanced"] = "advanced",
     include_domains: Optional[List[str]] = None,
-    exclude_domains: Optional[List[str]] = None
+    exclude_domains: Optional[List[str]] = None,
+    detail: Literal["brief", "standard", "full"] = "standard"
 ) -> str:
     """Performs a web search using Tavily's AI search engine and generates a direct answer to the query,
     along with supporting search results.
@@ -184,6 +587,7 @@ async def tavily_answer_search(
         search_depth: Depth of search - 'basic' or 'advanced' (default: advanced)
         include_domains: List of domains to specifically include in results (optional)
         exclude_domains: List of domains to specifically exclude from results (optional)
+        detail: Result detail - 'brief' (~2k chars), 'standard' (~6k chars, default) or 'full' (untruncated)
         
     Returns:
         Formatted search results text with answer
@@ -193,7 +597,9 @@ async def tavily_answer_search(
         include_domains_list = SearchBase.parse_domains_list(include_domains) if include_domains else []
         exclude_domains_list = SearchBase.parse_domains_list(exclude_domains) if exclude_domains else []
         
-        response = client.search(
+        response = await cached_search(
+            "tavily_answer_search",
+            "answer",
             query=query,
             max_results=max_results,
             search_depth=search_depth,
@@ -208,7 +614,7 @@ async def tavily_answer_search(
         if exclude_domains_list:
             response["excluded_domains"] = exclude_domains_list
             
-        return format_results(response)
+        return format_results(response, detail)
     except (InvalidAPIKeyError, UsageLimitExceededError) as e:
         error_msg = f"Tavily API error: {str(e)}"
         logger.error(error_msg)
@@ -224,7 +630,8 @@ async def tavily_news_search(
     max_results: int = 5,
     days: Optional[int] = 3,
     include_domains: Optional[List[str]] = None,
-    exclude_domains: Optional[List[str]] = None
+    exclude_domains: Optional[List[str]] = None,
+    detail: Literal["brief", "standard", "full"] = "standard"
 ) -> str:
     """Searches recent news articles using Tavily's specialized news search functionality.
     
@@ -234,6 +641,7 @@ async def tavily_news_search(
         days: Number of days back to search (default: 3)
         include_domains: List of domains to specifically include in results (optional)
         exclude_domains: List of domains to specifically exclude from results (optional)
+        detail: Result detail - 'brief' (~2k chars), 'standard' (~6k chars, default) or 'full' (untruncated)
         
     Returns:
         Formatted news search results text
@@ -243,7 +651,9 @@ async def tavily_news_search(
         include_domains_list = SearchBase.parse_domains_list(include_domains) if include_domains else []
         exclude_domains_list = SearchBase.parse_domains_list(exclude_domains) if exclude_domains else []
         
-        response = client.search(
+        response = await cached_search(
+            "tavily_news_search",
+            "news",
             query=query,
             max_results=max_results,
             topic="news",
@@ -258,7 +668,7 @@ async def tavily_news_search(
         if exclude_domains_list:
             response["excluded_domains"] = exclude_domains_list
             
-        return format_results(response)
+        return format_results(response, detail)
     except (InvalidAPIKeyError, UsageLimitExceededError) as e:
         error_msg = f"Tavily API error: {str(e)}"
         logger.error(error_msg)
@@ -268,5 +678,131 @@ async def tavily_news_search(
         logger.error(error_msg)
         return error_msg
 
+MAX_BATCH_QUERIES = 10
+BATCH_CONCURRENCY = int(os.getenv("TAVILY_BATCH_CONCURRENCY", "4"))  # searches of one batch in flight
+
+def parse_queries(queries) -> List[str]:
+    """Parse a query list given as a list, a JSON array string or one query per line; drops repeats"""
+    if isinstance(queries, str):
+        try:
+            parsed = json.loads(queries)
+            queries = parsed if isinstance(parsed, list) else [str(parsed)]
+        except json.JSONDecodeError:
+            queries = queries.splitlines()
+    distinct = {}
+    for query in queries or []:
+        query = " ".join(str(query).split())
+        if query and query.lower() not in distinct:
+            distinct[query.lower()] = query
+    return list(distinct.values())
+
+def normalize_url(url: str) -> str:
+    """URL form used to spot the same page in different result sets"""
+    url = re.sub(r"^https?://(www\.)?", "", url.strip().lower())
+    return url.split("#", 1)[0].rstrip("/")
+
+def merge_results(result_sets: List[tuple]) -> List[dict]:
+    """
+    Merge the results of several searches, one entry per page
+
+    Args:
+        result_sets: (query, response) pairs
+
+    Returns:
+        Results ranked by their best score, then by how many queries found them, each with
+        the 'queries' that returned it
+    """
+    merged = {}
+    for query, response in result_sets:
+        for result in response.get("results", []):
+            key = normalize_url(result["url"])
+            if key not in merged:
+                merged[key] = {**result, "queries": [query]}
+                continue
+            entry = merged[key]
+            entry["queries"].append(query)
+            if result.get("score", 0) > entry.get("score", 0):
+                entry.update({k: v for k, v in result.items() if k != "queries"})
+    return sorted(merged.values(), key=lambda r: (-r.get("score", 0), -len(r["queries"])))
+
+@mcp.tool()
+async def tavily_batch_search(
+    queries: Union[List[str], str],
+    max_results: int = 5,
+    search_depth: Literal["basic", "advanced"] = "basic",
+    include_domains: Optional[List[str]] = None,
+    exclude_domains: Optional[List[str]] = None,
+    max_total_results: int = 20,
+    detail: Literal["brief", "standard", "full"] = "standard"
+) -> str:
+    """Runs several related web searches at once (e.g. one per target or compound) and returns one
+    merged result list with duplicate pages removed. Use it instead of calling tavily_web_search
+    repeatedly when a question needs multiple searches.
+    
+    Args:
+        queries: Search queries (up to 10), as a list, a JSON array string or one query per line
+        max_results: Maximum number of results per query (default: 5)
+        search_depth: Depth of search - 'basic' or 'advanced' (default: basic)
+        include_domains: List of domains to specifically include in results (optional)
+        exclude_domains: List of domains to specifically exclude from results (optional)
+        detail: Result detail - 'brief' (~2k chars), 'standard' (~6k chars, default) or 'full' (untruncated)
+        max_total_results: Maximum number of merged results to return (default: 20)
+        
+    Returns:
+        Formatted search results text, ranked by relevance across all queries
+    """
+    try:
+        query_list = parse_queries(queries)
+        if not query_list:
+            return "tavily_batch_search error: no queries given"
+        skipped = query_list[MAX_BATCH_QUERIES:]
+        query_list = query_list[:MAX_BATCH_QUERIES]
+
+        include_domains_list = SearchBase.parse_domains_list(include_domains) if include_domains else []
+        exclude_domains_list = SearchBase.parse_domains_list(exclude_domains) if exclude_domains else []
+        slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def search(query):
+            async with slots:
+                # Same cache entries as single tavily_web_search calls
+                return await cached_search(
+                    "tavily_web_search",
+                    "general",
+                    query=query,
+                    max_results=max_results,
+                    search_depth=search_depth,
+                    include_domains=include_domains_list,
+                    exclude_domains=exclude_domains_list,
+                )
+
+        responses = await asyncio.gather(*(search(query) for query in query_list), return_exceptions=True)
+        failed = [(q, r) for q, r in zip(query_list, responses) if isinstance(r, BaseException)]
+        succeeded = [(q, r) for q, r in zip(query_list, responses) if not isinstance(r, BaseException)]
+        if not succeeded:
+            raise failed[0][1]
+
+        response = {"results": merge_results(succeeded)[:max_total_results]}
+        if include_domains_list:
+            response["included_domains"] = include_domains_list
+        if exclude_domains_list:
+            response["excluded_domains"] = exclude_domains_list
+
+        notes = [f"Searched {len(succeeded)} queries, {len(response['results'])} distinct results"]
+        for query, error in failed:
+            logger.error(f"tavily_batch_search query {query!r} failed: {error}")
+            reason = str(error).splitlines()[0] if str(error) else type(error).__name__
+            notes.append(f"Failed query: {query} ({reason})")
+        if skipped:
+            notes.append(f"Skipped queries over the limit of {MAX_BATCH_QUERIES}: {'; '.join(skipped)}")
+        return "\n".join(notes) + "\n\n" + format_results(response, detail)
+    except (InvalidAPIKeyError, UsageLimitExceededError) as e:
+        error_msg = f"Tavily API error: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+    except Exception as e:
+        error_msg = f"tavily_batch_search error: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
 if __name__ == "__main__":
     mcp.run()
\ No newline at end of file
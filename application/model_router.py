@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Optional
+
+import info
+
+logger = logging.getLogger(__name__)
+
+MODEL_ROUTING = os.getenv("MODEL_ROUTING", "Enable")
+# Sub-agents default to a small model; the orchestrator uses the sidebar model unless a policy names one
+DEFAULT_POLICY = {
+    "chembl": "Claude 3.5 Haiku",
+    "uniprot": "Claude 3.5 Haiku",
+    "pdb": "Claude 3.5 Haiku",
+}
+# JSON object of role -> model name from info.py, e.g. {"orchestrator": "Claude 4 Sonnet", "pdb": "Nova Lite"}
+POLICY_OVERRIDES = json.loads(os.getenv("MODEL_ROUTING_POLICY") or "{}")
+# An unknown name has no model profile, so every turn of that role would fail to build its model
+for _role, _name in list(POLICY_OVERRIDES.items()):
+    if not info.get_model_info(_name):
+        logger.warning(f"MODEL_ROUTING_POLICY: unknown model '{_name}' for role '{_role}' ignored")
+        del POLICY_OVERRIDES[_role]
+POLICY = {**DEFAULT_POLICY, **POLICY_OVERRIDES}
+MIN_ANSWER_CHARS = int(os.getenv("MODEL_ROUTING_MIN_ANSWER_CHARS", "80"))  # shorter answers are escalated
+
+# Answers that admit the lookup did not work
+LOW_CONFIDENCE_PATTERNS = re.compile(
+    r"찾을 수 없|찾지 못|확인할 수 없|제공할 수 없|정보가 없|오류가 발생|"
+    r"couldn't find|could not find|unable to|no results|not available|an error occurred",
+    re.IGNORECASE,
+)
+
+
+def model_for_role(role: str, default: str) -> str:
+    """
+    Get the model name the policy assigns to an agent role
+
+    Args:
+        role: 'orchestrator' or a research agent type ('chembl', 'uniprot', 'pdb')
+        default: Model selected in the sidebar, used for roles without a policy entry
+
+    Returns:
+        Model name as listed in info.py
+    """
+    if MODEL_ROUTING != "Enable":
+        return default
+    return POLICY.get(role, default)
+
+
+def escalation_reason(result) -> Optional[str]:
+    """
+    Decide whether a sub-agent answer is too weak to keep
+
+    Args:
+        result: AgentResult of the sub-agent
+
+    Returns:
+        Why the answer should be redone by a larger model, or None to keep it
+    """
+    text = str(result).strip()
+    if result.stop_reason == "max_tokens":
+        return "max_tokens"
+    if len(text) < MIN_ANSWER_CHARS:
+        return "short_answer"
+    tool_metrics = getattr(result.metrics, "tool_metrics", {}) or {}
+    calls = sum(metrics.call_count for metrics in tool_metrics.values())
+    if calls and not sum(metrics.success_count for metrics in tool_metrics.values()):
+        return "tool_errors"
+    # Only the opening of the answer: a long answer may mention one missing detail
+    if LOW_CONFIDENCE_PATTERNS.search(text[:300]):
+        return "low_confidence"
+    return None
+
+
+class RoleStats:
+    """Latency, token and escalation counters per (role, model), used to tune the routing policy"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = defaultdict(
+            lambda: {"calls": 0, "failures": 0, "escalations": 0, "seconds": 0.0, "input_tokens": 0, "output_tokens": 0}
+        )
+
+    def record(
+        self,
+        role: str,
+        model: str,
+        seconds: float,
+        usage: Optional[dict] = None,
+        failed: bool = False,
+        escalated: bool = False,
+    ):
+        """
+        Record one agent run
+
+        Args:
+            role: Agent role
+            model: Model name the agent ran on
+            seconds: Wall time of the run
+            usage: Accumulated token usage of the run
+            failed: The run raised an error
+            escalated: The run was redone by a larger model
+        """
+        usage = usage or {}
+        with self._lock:
+            stats = self._stats[(role, model)]
+            stats["calls"] += 1
+            stats["seconds"] += seconds
+            stats["input_tokens"] += usage.get("inputTokens", 0)
+            stats["output_tokens"] += usage.get("outputTokens", 0)
+            stats["failures"] += failed
+            stats["escalations"] += escalated
+
+    def get_stats(self) -> dict:
+        """Get the counters keyed 'role/model', with the average latency and escalation rate"""
+        with self._lock:
+            snapshot = {key: dict(stats) for key, stats in self._stats.items()}
+        result = {}
+        for (role, model), stats in snapshot.items():
+            stats["avg_seconds"] = round(stats["seconds"] / stats["calls"], 3)
+            stats["escalation_rate"] = round(stats["escalations"] / stats["calls"], 3)
+            stats["seconds"] = round(stats["seconds"], 3)
+            result[f"{role}/{model}"] = stats
+        return result
@@ -0,0 +1,216 @@
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+from tool_cache import ToolResultCache
+
+logger = logging.getLogger(__name__)
+
+PREFETCH = os.getenv("MCP_PREFETCH", "Enable")
+MAX_CONCURRENCY = int(os.getenv("MCP_PREFETCH_CONCURRENCY", "2"))  # prefetch calls in flight across all turns
+MAX_PER_TURN = int(os.getenv("MCP_PREFETCH_MAX_PER_TURN", "8"))  # prefetch calls scheduled per turn
+WAIT_TIMEOUT = float(os.getenv("MCP_PREFETCH_WAIT_TIMEOUT", "30"))  # seconds an agent waits for a prefetch in flight
+MAX_IDS_PER_RESULT = 2  # identifiers of each kind taken from one tool result
+MAX_TRACKED = 1024  # prefetched results remembered for the 'used' counter
+
+# Identifiers worth following across databases
+IDENTIFIER_PATTERNS = {
+    "uniprot": re.compile(r"\b(?:[OPQ][0-9][A-Z0-9]{3}[0-9]|[A-NR-Z][0-9](?:[A-Z][A-Z0-9]{2}[0-9]){1,2})\b"),
+    "chembl": re.compile(r"\bCHEMBL\d+\b"),
+    "pdb": re.compile(r"\b[1-9](?=[A-Z0-9]{0,2}[A-Z])[A-Z0-9]{3}\b"),
+}
+
+# (source server, source tools or None for any, identifier kind, follow-up server, follow-up tool)
+RULES = [
+    # A UniProt entry leads to its structures and its ChEMBL targets
+    ("uniprot", None, "uniprot", "pdb", "search_by_uniprot"),
+    ("uniprot", None, "uniprot", "chembl", "search_by_uniprot"),
+    ("uniprot", {"get_protein_info", "get_protein_structure"}, "pdb", "pdb", "get_structure_info"),
+    # A ChEMBL target names its UniProt components
+    ("chembl", None, "uniprot", "uniprot", "get_protein_info"),
+    ("chembl", None, "uniprot", "pdb", "search_by_uniprot"),
+    ("chembl", {"search_by_uniprot"}, "chembl", "chembl", "get_target_info"),
+    # A PDB entry names the UniProt accessions of its chains
+    ("pdb", None, "uniprot", "uniprot", "get_protein_info"),
+    ("pdb", None, "uniprot", "chembl", "search_by_uniprot"),
+]
+
+
+def find_identifiers(text: str, kind: str, limit: int = MAX_IDS_PER_RESULT) -> List[str]:
+    """Distinct identifiers of one kind in order of appearance"""
+    found = []
+    for match in IDENTIFIER_PATTERNS[kind].finditer(text):
+        if match.group(0) not in found:
+            found.append(match.group(0))
+            if len(found) >= limit:
+                break
+    return found
+
+
+def identifier_argument(tool) -> Optional[str]:
+    """Name of the parameter a lookup tool takes its identifier in (its only required string)"""
+    schema = tool.tool_spec["inputSchema"]["json"]
+    properties = schema.get("properties", {})
+    required = [
+        name for name in schema.get("required", list(properties)) if properties.get(name, {}).get("type") == "string"
+    ]
+    return required[0] if len(required) == 1 else None
+
+
+class _Turn:
+    def __init__(self, servers):
+        self.servers = set(servers)
+        self.scheduled = 0
+        self.futures: List[Future] = []
+
+
+class Prefetcher:
+    """Warms the tool result cache with the lookups an agent is likely to make next
+
+    Successful tool results of a multi-server turn are scanned for UniProt,
+    ChEMBL and PDB identifiers, and the follow-up lookups of RULES are run in
+    the background on the servers the turn holds. An agent that makes one of
+    those calls while it is still running waits for it instead of calling
+    the server again. Pending prefetches are cancelled when the turn ends.
+    """
+
+    def __init__(
+        self,
+        tool_provider: Callable[[str], list],
+        cache: ToolResultCache,
+        max_concurrency: int = MAX_CONCURRENCY,
+        max_per_turn: int = MAX_PER_TURN,
+    ):
+        """
+        Args:
+            tool_provider: Returns the cache-backed tools of a server
+            cache: Tool result cache the prefetched results are stored in
+            max_concurrency: Prefetch calls in flight at once
+            max_per_turn: Prefetch calls scheduled per turn
+        """
+        self.tool_provider = tool_provider
+        self.cache = cache
+        self.max_per_turn = max_per_turn
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._turns: Dict[str, _Turn] = {}
+        self._inflight: Dict[tuple, Future] = {}
+        self._prefetched: "OrderedDict[tuple, None]" = OrderedDict()  # keys warmed by a prefetch, not used yet
+        self._stats = {"scheduled": 0, "completed": 0, "cancelled": 0, "failed": 0, "used": 0}
+
+    def begin_turn(self, session_id: str, servers):
+        """Allow prefetching on the given servers for a session's turn"""
+        if PREFETCH != "Enable" or len(set(servers)) < 2:
+            return
+        with self._lock:
+            self._turns[session_id] = _Turn(servers)
+
+    def end_turn(self, session_id: str):
+        """Stop prefetching for a session and cancel its prefetches that have not started"""
+        with self._lock:
+            turn = self._turns.pop(session_id, None)
+        if turn is None:
+            return
+        cancelled = sum(future.cancel() for future in turn.futures)
+        if cancelled:
+            with self._lock:
+                self._stats["cancelled"] += cancelled
+            logger.info(f"prefetch: cancelled {cancelled} pending lookups of session {session_id}")
+
+    @contextmanager
+    def turn(self, session_id: str, servers):
+        """Prefetch for a session while the block runs"""
+        self.begin_turn(session_id, servers)
+        try:
+            yield
+        finally:
+            self.end_turn(session_id)
+
+    def observe(self, server: str, tool_name: str, result: dict, session_id: Optional[str]):
+        """
+        Schedule the follow-up lookups of a tool result
+
+        Args:
+            server: Server the result came from
+            tool_name: Tool that produced it
+            result: Tool result with 'status' and 'content'
+            session_id: Session whose turn made the call
+        """
+        if result["status"] != "success" or session_id is None:
+            return
+        with self._lock:
+            turn = self._turns.get(session_id)
+        if turn is None:
+            return
+
+        text = "\n".join(str(item.get("text", "")) for item in result["content"])
+        for source_server, source_tools, kind, target_server, target_tool in RULES:
+            if source_server != server or target_server not in turn.servers:
+                continue
+            if source_tools is not None and tool_name not in source_tools:
+                continue
+            for identifier in find_identifiers(text, kind):
+                self._schedule(turn, session_id, target_server, target_tool, identifier)
+
+    def _schedule(self, turn: _Turn, session_id: str, server: str, tool_name: str, identifier: str):
+        tool = next((t for t in self.tool_provider(server) if t.tool_name == tool_name), None)
+        argument = identifier_argument(tool) if tool is not None else None
+        if argument is None:
+            return
+        arguments = {argument: identifier}
+        key = self.cache.make_key(server, tool_name, arguments)
+
+        if self.cache.get(server, tool_name, arguments, count=False) is not None:
+            return
+        with self._lock:
+            if key in self._inflight or turn.scheduled >= self.max_per_turn or self._turns.get(session_id) is not turn:
+                return
+            turn.scheduled += 1
+            self._stats["scheduled"] += 1
+            future = self._executor.submit(self._fetch, tool, key, arguments)
+            self._inflight[key] = future
+            turn.futures.append(future)
+        future.add_done_callback(lambda f: self._done(key, f))
+        logger.info(f"prefetch: {server}.{tool_name}({identifier})")
+
+    def _fetch(self, tool, key: tuple, arguments: dict):
+        tool.fetch(arguments)
+        with self._lock:
+            self._prefetched[key] = None
+            while len(self._prefetched) > MAX_TRACKED:
+                self._prefetched.popitem(last=False)
+
+    def _done(self, key: tuple, future: Future):
+        with self._lock:
+            self._inflight.pop(key, None)
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                self._stats["failed"] += 1
+                logger.warning(f"prefetch of {key[0]}.{key[1]} failed: {future.exception()}")
+            else:
+                self._stats["completed"] += 1
+
+    def wait(self, server: str, tool_name: str, arguments: Optional[dict], timeout: float = WAIT_TIMEOUT):
+        """Block until a prefetch of the same call finishes, if one is running; counts prefetches that got used"""
+        key = self.cache.make_key(server, tool_name, arguments)
+        with self._lock:
+            future = self._inflight.get(key)
+        if future is not None:
+            wait([future], timeout=timeout)
+        with self._lock:
+            if self._prefetched.pop(key, False) is None:
+                self._stats["used"] += 1
+
+    def get_stats(self) -> dict:
+        """Get scheduled/completed/cancelled/used counters"""
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._inflight), "active_turns": len(self._turns)}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,93 @@
+import re
+
+def extract_and_format_references(content):
+    """웹 검색 결과에서 출처를 추출하고 숫자 링크로 포맷팅"""
+    # URL 패턴 매칭 (다양한 형태의 URL 참조 처리)
+    url_patterns = [
+        r'\[([^\]]+)\]\((https?://[^\)]+)\)',  # [text](url) 형태
+        r'출처:\s*(https?://[^\s]+)',  # 출처: url 형태
+        r'Source:\s*(https?://[^\s]+)',  # Source: url 형태
+        r'참고:\s*(https?://[^\s]+)',  # 참고: url 형태
+        r'Reference:\s*(https?://[^\s]+)',  # Reference: url 형태
+        r'(https?://[^\s]+)',  # 단순 URL 형태
+    ]
+    
+    references = []
+    reference_counter = 1
+    formatted_content = content
+    
+    # URL과 제목을 매칭하여 참고문헌 추출
+    for pattern in url_patterns:
+        matches = re.finditer(pattern, content, re.IGNORECASE)
+        for match in matches:
+            if len(match.groups()) == 2:  # [text](url) 형태
+                title, url = match.groups()
+                if url not in [ref['url'] for ref in references]:
+                    references.append({
+                        'number': reference_counter,
+                        'title': title,
+                        'url': url
+                    })
+                    # 본문에서 해당 부분을 숫자 링크로 교체
+                    formatted_content = formatted_content.replace(
+                        match.group(0), 
+                        f"{title} [{reference_counter}]"
+                    )
+                    reference_counter += 1
+            else:  # 단순 URL 형태
+                url = match.group(1) if len(match.groups()) >= 1 else match.group(0)
+                if url not in [ref['url'] for ref in references]:
+                    # URL에서 도메인명 추출하여 제목으로 사용
+                    domain = re.search(r'https?://(?:www\.)?([^/]+)', url)
+                    title = domain.group(1) if domain else url
+                    references.append({
+                        'number': reference_counter,
+                        'title': title,
+                        'url': url
+                    })
+                    # 본문에서 해당 URL을 숫자 링크로 교체
+                    formatted_content = formatted_content.replace(
+                        url, 
+                        f"[{reference_counter}]"
+                    )
+                    reference_counter += 1
+    
+    return formatted_content, references
+
+def format_references(content):
+    """참고문헌 섹션을 더 읽기 쉽게 포맷팅하고 숫자 링크 추가"""
+    # 먼저 URL 참조를 숫자 링크로 변환
+    formatted_content, references = extract_and_format_references(content)
+    
+    # 기존 참고문헌 섹션 처리
+    if "참고문헌:" in formatted_content or "References:" in formatted_content:
+        lines = formatted_content.split('\n')
+        formatted_lines = []
+        in_references = False
+        
+        for line in lines:
+            if line.strip().startswith("참고문헌:") or line.strip().startswith("References:"):
+                in_references = True
+                formatted_lines.append(f"\n## {line.strip()}\n")
+            elif in_references and line.strip().startswith("["):
+                formatted_lines.append(f"{line.strip()}\n")
+            else:
+                if in_references and line.strip() == "":
+                    formatted_lines.append(line)
+                elif in_references and not line.strip().startswith("[") and line.strip() != "":
+                    in_references = False
+                    formatted_lines.append(line)
+                else:
+                    formatted_lines.append(line)
+        
+        formatted_content = '\n'.join(formatted_lines)
+    
+    # 새로운 참고문헌이 있으면 추가
+    if references:
+        if "참고문헌:" not in formatted_content and "References:" not in formatted_content:
+            formatted_content += "\n\n## 참고문헌\n\n"
+        
+        for ref in references:
+            formatted_content += f"[{ref['number']}] [{ref['title']}]({ref['url']})\n\n"
+    
+    return formatted_content
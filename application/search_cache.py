@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, Optional
+
+from sqlalchemy import Column, Float, String, Text, create_engine, delete
+from sqlalchemy.orm import Session, declarative_base
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("TAVILY_CACHE_MAX_ENTRIES", "512"))
+DEFAULT_CACHE_PATH = os.getenv("TAVILY_CACHE_PATH") or None  # SQLite file, memory only if unset
+
+# Time to live per topic in seconds; news moves in minutes, web pages and generated answers in hours
+TOPIC_TTLS = {
+    "news": float(os.getenv("TAVILY_CACHE_NEWS_TTL", str(10 * 60))),
+    "general": float(os.getenv("TAVILY_CACHE_GENERAL_TTL", str(6 * 3600))),
+    "answer": float(os.getenv("TAVILY_CACHE_ANSWER_TTL", str(6 * 3600))),
+}
+DEFAULT_TTL = 3600
+
+Base = declarative_base()
+
+
+class CachedSearch(Base):
+    __tablename__ = "searches"
+
+    key = Column(String(64), primary_key=True)
+    tool = Column(String(64), nullable=False)
+    response = Column(Text, nullable=False)
+    expires_at = Column(Float, nullable=False, index=True)
+
+
+def normalize_domains(domains: Optional[Iterable[str]]) -> tuple:
+    """Domain filter in canonical form: lower case, no scheme, 'www.' or path, sorted and distinct"""
+    normalized = set()
+    for domain in domains or []:
+        domain = re.sub(r"^[a-z]+://", "", domain.strip().lower())
+        domain = domain.split("/", 1)[0]
+        if domain.startswith("www."):
+            domain = domain[4:]
+        if domain:
+            normalized.add(domain)
+    return tuple(sorted(normalized))
+
+
+def make_key(
+    tool: str,
+    query: str,
+    max_results: int,
+    search_depth: Optional[str] = None,
+    days: Optional[int] = None,
+    include_domains: Optional[Iterable[str]] = None,
+    exclude_domains: Optional[Iterable[str]] = None,
+) -> tuple:
+    """Cache key of a search; queries that differ only in whitespace share it"""
+    return (
+        tool,
+        " ".join(query.split()),
+        max_results,
+        search_depth,
+        days,
+        normalize_domains(include_domains),
+        normalize_domains(exclude_domains),
+    )
+
+
+class SearchCache:
+    """Caches Tavily responses in a bounded in-memory LRU with optional SQLite persistence
+
+    Identical searches that arrive while one is already being fetched wait for
+    that fetch instead of calling the API again. Failed searches are not cached.
+    Must be used from a single event loop (the MCP server's).
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, path: Optional[str] = DEFAULT_CACHE_PATH):
+        """
+        Args:
+            max_entries: Number of responses kept in memory
+            path: SQLite file the responses are persisted to (None for memory only)
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (expires_at, response JSON)
+        self._inflight: dict = {}
+        self._engine = None
+        self._engine_lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0, "stores": 0, "evictions": 0}
+
+    @property
+    def engine(self):
+        with self._engine_lock:
+            if self._engine is None and self.path:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._engine = create_engine(f"sqlite:///{self.path}")
+                Base.metadata.create_all(self._engine)
+                with Session(self._engine) as session:
+                    session.execute(delete(CachedSearch).where(CachedSearch.expires_at < time.time()))
+                    session.commit()
+            return self._engine
+
+    @staticmethod
+    def _row_key(key: tuple) -> str:
+        return hashlib.sha256(json.dumps(key, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    async def get_or_fetch(self, key: tuple, ttl: float, fetch: Callable[[], Awaitable[dict]]) -> dict:
+        """
+        Get a cached response or fetch it once for all concurrent callers
+
+        Args:
+            key: Cache key from make_key()
+            ttl: Seconds a fetched response stays valid
+            fetch: Coroutine function calling the API
+
+        Returns:
+            A copy of the response, safe to modify
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] >= time.time():
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return json.loads(entry[1])
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load_or_fetch(key, ttl, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self._stats["coalesced"] += 1
+            logger.info(f"Search coalesced with the one in flight: {key[0]} {key[1]!r}")
+        # A caller that gives up must not cancel the fetch the others are waiting for
+        return json.loads(await asyncio.shield(task))
+
+    async def _load_or_fetch(self, key: tuple, ttl: float, fetch: Callable[[], Awaitable[dict]]) -> str:
+        if self.path:
+            stored = await asyncio.to_thread(self._load, key)
+            if stored is not None:
+                self._stats["disk_hits"] += 1
+                self._remember(key, stored)
+                return stored[1]
+
+        self._stats["misses"] += 1
+        response = json.dumps(await fetch(), ensure_ascii=False)
+        entry = (time.time() + ttl, response)
+        self._remember(key, entry)
+        self._stats["stores"] += 1
+        if self.path:
+            await asyncio.to_thread(self._store, key, entry)
+        return response
+
+    def _load(self, key: tuple) -> Optional[tuple]:
+        try:
+            with Session(self.engine) as session:
+                row = session.get(CachedSearch, self._row_key(key))
+                if row is not None and row.expires_at >= time.time():
+                    return (row.expires_at, row.response)
+        except Exception as e:
+            logger.error(f"Search cache lookup failed: {e}")
+        return None
+
+    def _store(self, key: tuple, entry: tuple):
+        try:
+            with Session(self.engine) as session:
+                session.merge(CachedSearch(key=self._row_key(key), tool=key[0], response=entry[1], expires_at=entry[0]))
+                session.commit()
+        except Exception as e:
+            logger.error(f"Search cache store failed: {e}")
+
+    def _remember(self, key: tuple, entry: tuple):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get_stats(self) -> dict:
+        """Get hit/miss counters, the hit rate (coalesced calls count as hits) and the entries held in memory"""
+        lookups = self._stats["hits"] + self._stats["disk_hits"] + self._stats["misses"] + self._stats["coalesced"]
+        saved = lookups - self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "in_flight": len(self._inflight),
+            "hit_rate": round(saved / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,101 @@
+"""
+Cold start orchestration for the Streamlit app
+
+app.py only imports this module (and Streamlit) before the first page paint.
+The heavy `chat` module (Strands, botocore, MCP, SQLAlchemy) is imported in a
+background thread once the page has rendered, followed by a warmup of the MCP
+server sessions and the Bedrock clients. Code that needs `chat` earlier calls
+get_chat(), which waits for the running import instead of starting another.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+WARMUP = os.getenv("STARTUP_WARMUP", "Enable")
+# Comma separated MCP servers to start in the background (all registered servers if empty)
+WARMUP_SERVERS = [name for name in os.getenv("STARTUP_WARMUP_SERVERS", "").split(",") if name]
+
+STARTED_AT = time.time()  # when the app script first ran in this process
+
+_lock = threading.Lock()
+_warmup_thread: Optional[threading.Thread] = None
+_timings = {}
+
+
+def record(name: str, seconds: float, once: bool = False):
+    """Store a timing in seconds; with `once`, keep the first value recorded under the name"""
+    with _lock:
+        if once and name in _timings:
+            return
+        _timings[name] = round(seconds, 3)
+    logger.info(f"startup timing {name}: {seconds:.3f}s")
+
+
+def get_chat():
+    """
+    Get the chat module, importing it on first use
+
+    Python's import lock makes this wait for a background import that is
+    already running rather than importing twice.
+    """
+    start = time.perf_counter()
+    import chat
+
+    waited = time.perf_counter() - start
+    if waited > 0.01:
+        record("chat_import_wait", waited, once=True)
+    return chat
+
+
+def _warmup(model_name: str, reasoning_mode: str):
+    start = time.perf_counter()
+    try:
+        import chat
+    except Exception as e:
+        logger.error(f"Background import of chat failed: {e}")  # get_chat() raises it on first use
+        return
+    record("import.chat", time.perf_counter() - start)
+    if WARMUP != "Enable":
+        return
+    try:
+        # Only prebuilds the model; chat.update() belongs to the UI thread
+        for name, seconds in chat.warmup(WARMUP_SERVERS or None, model_name, reasoning_mode).items():
+            record(f"warmup.{name}", seconds)
+    except Exception as e:
+        logger.error(f"Startup warmup failed: {e}")
+    record("warmup.total", time.perf_counter() - start)
+
+
+def start_warmup(model_name: str, reasoning_mode: str):
+    """
+    Import chat and warm MCP sessions and Bedrock clients in the background (once per process)
+
+    Args:
+        model_name: Model selected in the sidebar, so the warmed Bedrock model is the one used
+        reasoning_mode: 'Enable' or 'Disable'
+    """
+    global _warmup_thread
+    with _lock:
+        if _warmup_thread is not None:
+            return
+        _warmup_thread = threading.Thread(
+            target=_warmup, args=(model_name, reasoning_mode), name="startup-warmup", daemon=True
+        )
+    record("first_paint", time.time() - STARTED_AT, once=True)
+    _warmup_thread.start()
+
+
+def record_first_response(seconds: float):
+    """Record the latency of the first answer of this process and its time since startup"""
+    record("first_response", seconds, once=True)
+    record("first_response_since_start", time.time() - STARTED_AT, once=True)
+
+
+def get_timings() -> dict:
+    """Get the recorded startup timings in seconds"""
+    with _lock:
+        return dict(_timings)
@@ -0,0 +1,65 @@
+import io
+import time
+
+DEFAULT_MAX_FPS = 8.0  # re-renders per second
+PARAGRAPH_BREAK = "\n\n"
+
+
+class StreamingRenderer:
+    """Coalesces streamed text chunks and re-renders a Streamlit placeholder at a bounded rate
+
+    Re-rendering the whole markdown on every token is quadratic in the response
+    length. Chunks are appended to a StringIO buffer instead, and the placeholder
+    is only refreshed when `1 / max_fps` seconds have passed since the last
+    refresh or when a paragraph has just been completed.
+    """
+
+    def __init__(self, placeholder, max_fps: float = DEFAULT_MAX_FPS, clock=time.monotonic):
+        """
+        Args:
+            placeholder: Streamlit element with a `markdown` method (e.g. st.empty())
+            max_fps: Maximum number of re-renders per second
+            clock: Monotonic clock, injectable for benchmarks
+        """
+        self.placeholder = placeholder
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.clock = clock
+        self.flush_count = 0
+        self._buffer = io.StringIO()
+        self._dirty = False
+        self._last_flush = float("-inf")
+        self._tail = ""  # end of the buffered text, to spot paragraph breaks split across chunks
+
+    def write(self, chunk: str):
+        """Append a streamed chunk, flushing if the frame interval elapsed or a paragraph ended"""
+        if not chunk:
+            return
+        self._buffer.write(chunk)
+        self._dirty = True
+        recent = self._tail + chunk
+        self._tail = recent[-(len(PARAGRAPH_BREAK) - 1):]
+        if PARAGRAPH_BREAK in recent or self.clock() - self._last_flush >= self.min_interval:
+            self.flush()
+
+    def flush(self):
+        """Render the buffered text if anything changed since the last render"""
+        if not self._dirty:
+            return
+        self.placeholder.markdown(self._buffer.getvalue())
+        self._dirty = False
+        self._last_flush = self.clock()
+        self.flush_count += 1
+
+    def show(self, message: str):
+        """Show a transient status message; it is replaced by the next flush"""
+        self.placeholder.markdown(message)
+        self._dirty = True
+
+    def close(self) -> str:
+        """Render any remaining text and return the full response"""
+        self.flush()
+        return self.text
+
+    @property
+    def text(self) -> str:
+        return self._buffer.getvalue()
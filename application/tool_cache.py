@@ -0,0 +1,278 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Column, Float, LargeBinary, String, create_engine, delete
+from sqlalchemy.orm import Session, declarative_base
+from strands.tools.mcp import MCPAgentTool
+
+import deadlines
+import tracing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("MCP_TOOL_CACHE_MAX_ENTRIES", "2048"))
+DEFAULT_CACHE_PATH = os.getenv("MCP_TOOL_CACHE_PATH") or None  # SQLite file, memory only if unset
+NEGATIVE_TTL = float(os.getenv("MCP_TOOL_CACHE_NEGATIVE_TTL", "60"))  # seconds
+
+# Time to live per server in seconds; web results go stale quickly, database records change slowly
+SERVER_TTLS = {
+    "tavily": 15 * 60,
+    "chembl": 24 * 3600,
+    "uniprot": 24 * 3600,
+    "pdb": 24 * 3600,
+}
+DEFAULT_TTL = 3600
+
+# Prefix MCPClient uses when the call itself failed (dead session, timeout); never cached
+CALL_FAILED_PREFIX = "Tool execution failed:"
+
+Base = declarative_base()
+
+
+class CachedToolResult(Base):
+    __tablename__ = "tool_results"
+
+    key = Column(String(64), primary_key=True)
+    server = Column(String(32), nullable=False)
+    tool = Column(String(128), nullable=False)
+    result = Column(LargeBinary, nullable=False)
+    expires_at = Column(Float, nullable=False, index=True)
+
+
+def canonicalize_arguments(arguments: Optional[Dict[str, Any]]) -> str:
+    """Serialize tool arguments so equivalent calls produce the same string (key order, omitted nulls)"""
+    arguments = {k: v for k, v in (arguments or {}).items() if v is not None}
+    return json.dumps(arguments, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class ToolResultCache:
+    """Memoizes MCP tool results in a bounded in-memory LRU with optional SQLite persistence
+
+    Results are keyed by (server, tool name, canonicalized arguments). Successful
+    results live for the tool's TTL; error results returned by the server (e.g.
+    an unknown identifier) are negatively cached for a short time, while failed
+    calls (dead session, timeout) are never cached.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        path: Optional[str] = DEFAULT_CACHE_PATH,
+        server_ttls: Dict[str, float] = None,
+        tool_ttls: Dict[str, float] = None,
+        negative_ttl: float = NEGATIVE_TTL,
+    ):
+        """
+        Args:
+            max_entries: Number of results kept in memory
+            path: SQLite file the results are persisted to (None for memory only)
+            server_ttls: Time to live in seconds per server
+            tool_ttls: Time to live in seconds per tool name, overriding the server TTL (0 disables caching)
+            negative_ttl: Time to live in seconds of error results
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self.server_ttls = server_ttls or SERVER_TTLS
+        self.tool_ttls = tool_ttls or {}
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()  # (server, tool, args) -> (expires_at, result)
+        self._lock = threading.Lock()
+        self._engine = None
+        self._stats = {"hits": 0, "misses": 0, "negative_hits": 0, "stores": 0, "evictions": 0}
+
+    @property
+    def engine(self):
+        with self._lock:
+            if self._engine is None and self.path:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._engine = create_engine(f"sqlite:///{self.path}")
+                Base.metadata.create_all(self._engine)
+                with Session(self._engine) as session:
+                    session.execute(delete(CachedToolResult).where(CachedToolResult.expires_at < time.time()))
+                    session.commit()
+            return self._engine
+
+    @staticmethod
+    def make_key(server: str, tool_name: str, arguments: Optional[Dict[str, Any]]) -> tuple:
+        return (server, tool_name, canonicalize_arguments(arguments))
+
+    @staticmethod
+    def _row_key(key: tuple) -> str:
+        return hashlib.sha256("\x00".join(key).encode("utf-8")).hexdigest()
+
+    def get_ttl(self, server: str, tool_name: str) -> float:
+        return self.tool_ttls.get(tool_name, self.server_ttls.get(server, DEFAULT_TTL))
+
+    def get(
+        self, server: str, tool_name: str, arguments: Optional[Dict[str, Any]], count: bool = True
+    ) -> Optional[dict]:
+        """
+        Look up a memoized tool result
+
+        Args:
+            server: Server the tool belongs to
+            tool_name: Tool name
+            arguments: Tool arguments
+            count: Whether the lookup counts towards the hit/miss stats (False for internal checks)
+
+        Returns:
+            Dictionary with 'status' and 'content' of the cached result, or None on a miss
+        """
+        if self.get_ttl(server, tool_name) <= 0:
+            return None
+        key = self.make_key(server, tool_name, arguments)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None and self.engine is not None:
+            try:
+                with Session(self.engine) as session:
+                    row = session.get(CachedToolResult, self._row_key(key))
+                    if row is not None and row.expires_at >= now:
+                        entry = (row.expires_at, pickle.loads(row.result))
+                        self._remember(key, entry)
+            except Exception as e:
+                logger.error(f"Tool cache lookup failed: {e}")
+
+        if not count:
+            return entry[1] if entry is not None else None
+        with self._lock:
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            if entry[1]["status"] == "error":
+                self._stats["negative_hits"] += 1
+        return entry[1]
+
+    def put(self, server: str, tool_name: str, arguments: Optional[Dict[str, Any]], status: str, content: list):
+        """Memoize a tool result; failed calls and tools with a zero TTL are skipped"""
+        ttl = self.get_ttl(server, tool_name)
+        if ttl <= 0:
+            return
+        if status == "error":
+            if any(str(item.get("text", "")).startswith(CALL_FAILED_PREFIX) for item in content):
+                return
+            ttl = min(ttl, self.negative_ttl)
+
+        key = self.make_key(server, tool_name, arguments)
+        entry = (time.time() + ttl, {"status": status, "content": content})
+        self._remember(key, entry)
+        with self._lock:
+            self._stats["stores"] += 1
+
+        if self.engine is not None:
+            try:
+                with Session(self.engine) as session:
+                    session.merge(
+                        CachedToolResult(
+                            key=self._row_key(key),
+                            server=server,
+                            tool=tool_name,
+                            result=pickle.dumps(entry[1]),
+                            expires_at=entry[0],
+                        )
+                    )
+                    session.commit()
+            except Exception as e:
+                logger.error(f"Tool cache store failed: {e}")
+
+    def _remember(self, key: tuple, entry: tuple):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self, server: str = None):
+        """Drop memoized results of a server (all servers if None)"""
+        with self._lock:
+            for key in [k for k in self._entries if server is None or k[0] == server]:
+                del self._entries[key]
+        if self.engine is not None:
+            with Session(self.engine) as session:
+                query = delete(CachedToolResult)
+                if server is not None:
+                    query = query.where(CachedToolResult.server == server)
+                session.execute(query)
+                session.commit()
+
+    def get_stats(self) -> dict:
+        """Get hit/miss counters and the number of results held in memory"""
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries)}
+
+
+class CachingMCPAgentTool(MCPAgentTool):
+    """MCPAgentTool whose invocations go through a ToolResultCache"""
+
+    def __init__(self, mcp_tool, mcp_client, server: str, cache: ToolResultCache, prefetcher=None):
+        super().__init__(mcp_tool, mcp_client)
+        self.server = server
+        self.cache = cache
+        # Optional prefetch.Prefetcher that is told about results and may already be fetching this call
+        self.prefetcher = prefetcher
+
+    def fetch(self, arguments: dict) -> dict:
+        """Call the tool outside of an agent and memoize the result"""
+        result = self.mcp_client.call_tool_sync(tool_use_id=uuid.uuid4().hex, name=self.tool_name, arguments=arguments)
+        self.cache.put(self.server, self.tool_name, arguments, result["status"], result["content"])
+        return result
+
+    def invoke(self, tool, *args, **kwargs):
+        # Tools run on Strands' thread pool, so find the turn and its deadline through the calling agent
+        attributes = getattr(kwargs.get("agent"), "trace_attributes", None) or {}
+        session_id = attributes.get("session.id")
+        deadline = deadlines.lookup(attributes.get("request.id"))
+        with tracing.span("mcp.tool", session_id=session_id, server=self.server, tool=self.tool_name) as span:
+            if tracing.is_enabled():
+                span.set_attribute("request_bytes", len(canonicalize_arguments(tool["input"])))
+
+            if self.prefetcher is not None:
+                self.prefetcher.wait(self.server, self.tool_name, tool["input"])
+            cached = self.cache.get(self.server, self.tool_name, tool["input"])
+            span.set_attribute("cache_hit", cached is not None)
+            if cached is not None:
+                logger.info(f"Tool cache hit: {self.server}.{self.tool_name}")
+                result = {"status": cached["status"], "toolUseId": tool["toolUseId"], "content": cached["content"]}
+            elif deadline is not None and deadline.reason is not None:
+                # The request is over; do not spend upstream quota on an answer nobody reads
+                deadlines.record("mcp", deadline.reason)
+                text = f"{CALL_FAILED_PREFIX} request {deadline.reason}"
+                result = {"status": "error", "toolUseId": tool["toolUseId"], "content": [{"text": text}]}
+            else:
+                remaining = deadline.remaining() if deadline is not None else None
+                result = self.mcp_client.call_tool_sync(
+                    tool_use_id=tool["toolUseId"],
+                    name=self.tool_name,
+                    arguments=tool["input"],
+                    read_timeout_seconds=timedelta(seconds=remaining) if remaining is not None else None,
+                )
+                if deadline is not None and deadline.reason is not None and result["status"] == "error":
+                    deadlines.record("mcp", deadline.reason)
+                self.cache.put(self.server, self.tool_name, tool["input"], result["status"], result["content"])
+                if self.prefetcher is not None:
+                    self.prefetcher.observe(self.server, self.tool_name, result, session_id)
+
+            if tracing.is_enabled():
+                span.set_attributes({
+                    "status": result["status"],
+                    "response_bytes": sum(len(item.get("text", "")) for item in result["content"]),
+                })
+            return result
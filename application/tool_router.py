@@ -0,0 +1,265 @@
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+TOOL_ROUTING = os.getenv("TOOL_ROUTING", "Enable")
+TOP_K = int(os.getenv("TOOL_ROUTING_TOP_K", "8"))  # tools of the fixed subset per search type
+TOP_UP = int(os.getenv("TOOL_ROUTING_TOP_UP", "2"))  # best query matches added when missing from that subset
+MIN_SCORE = float(os.getenv("TOOL_ROUTING_MIN_SCORE", "2.0"))  # best score below this falls back to every tool
+MIN_CATALOG = 12  # smaller catalogs are cheap enough to send whole
+NAME_WEIGHT = 3.0  # a term in the tool name counts this many times a description match
+
+# Korean query terms -> vocabulary of the (English) tool names and descriptions
+KEYWORD_TERMS = {
+    "화합물": ["compound", "molecule"],
+    "분자": ["molecule", "compound"],
+    "약물": ["drug"],
+    "신약": ["drug"],
+    "의약품": ["drug"],
+    "적응증": ["indication"],
+    "작용기전": ["mechanism", "action"],
+    "기전": ["mechanism"],
+    "타겟": ["target"],
+    "표적": ["target"],
+    "활성": ["activity", "bioactivity"],
+    "생물활성": ["bioactivity", "activity"],
+    "어세이": ["assay"],
+    "분석법": ["assay"],
+    "용량": ["dose", "response"],
+    "비교": ["compare"],
+    "유사": ["similar", "similarity"],
+    "유사체": ["similar", "analog"],
+    "부분구조": ["substructure"],
+    "구조": ["structure"],
+    "스마일": ["smiles"],
+    "용해도": ["solubility"],
+    "독성": ["admet", "toxicity"],
+    "흡수": ["admet"],
+    "약물유사성": ["likeness"],
+    "기술자": ["descriptor"],
+    "물성": ["descriptor", "property"],
+    "단백질": ["protein"],
+    "유전자": ["gene"],
+    "서열": ["sequence"],
+    "아미노산": ["sequence", "composition"],
+    "조성": ["composition"],
+    "기능": ["function", "feature"],
+    "도메인": ["domain", "feature"],
+    "변이": ["variant", "mutation"],
+    "돌연변이": ["variant", "mutation"],
+    "상동": ["homolog"],
+    "상동체": ["homolog"],
+    "직교체": ["ortholog"],
+    "계통": ["phylogenetic"],
+    "상호작용": ["interaction"],
+    "경로": ["pathway"],
+    "위치": ["location", "localization"],
+    "주석": ["annotation"],
+    "리간드": ["ligand"],
+    "결합": ["binding", "ligand"],
+    "결정": ["crystal", "experimental"],
+    "해상도": ["resolution", "quality"],
+    "품질": ["quality", "validation"],
+    "검증": ["validation", "quality"],
+    "다운로드": ["download"],
+    "좌표": ["coordinate", "download"],
+    "복합체": ["assembly", "complex"],
+    "외부": ["external", "reference"],
+    "참조": ["reference"],
+}
+
+# search_type argument of the agent builders -> extra query terms
+SEARCH_TYPE_TERMS = {
+    "compound": ["compound"],
+    "target": ["target"],
+    "bioactivity": ["activity", "bioactivity"],
+    "assay": ["assay"],
+    "protein": ["protein"],
+    "gene": ["gene"],
+    "sequence": ["sequence"],
+    "feature": ["feature", "domain"],
+    "structure": ["structure"],
+    "quality": ["quality"],
+    "ligand": ["ligand"],
+    "validation": ["validation", "quality"],
+}
+
+# Identifiers in the query hint at the lookup tools that take them
+IDENTIFIER_PATTERNS = [
+    (re.compile(r"\bCHEMBL\d+\b", re.IGNORECASE), ["chembl", "id"]),
+    (re.compile(r"\b[A-Z]{14}-[A-Z]{10}-[A-Z]\b"), ["inchi", "key"]),
+    (re.compile(r"\bInChI=", re.IGNORECASE), ["inchi"]),
+    (
+        re.compile(r"\b(?:[OPQ][0-9][A-Z0-9]{3}[0-9]|[A-NR-Z][0-9](?:[A-Z][A-Z0-9]{2}[0-9]){1,2})\b"),
+        ["uniprot", "accession"],
+    ),
+    (re.compile(r"\b[1-9](?=[A-Z0-9]{0,2}[A-Z])[A-Z0-9]{3}\b"), ["pdb", "id"]),
+    # A space-free run with bond or branch symbols and organic-subset atoms
+    (re.compile(r"(?<!\S)(?=\S*[=#(])(?=\S*[CNOcno])[A-Za-z0-9@+\-\[\]()=#\\/]{6,}(?!\S)"), ["smiles"]),
+]
+
+_WORD = re.compile(r"[a-z0-9]+|[가-힣]+")
+
+
+def stem(word: str) -> str:
+    """Crude English stemming so 'structures' matches 'structure'"""
+    for suffix in ("ies", "es", "s"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[: -len(suffix)] + ("y" if suffix == "ies" else "")
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    # Split snake_case and camelCase names into words first
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text).replace("_", " ").lower()
+    return [stem(word) for word in _WORD.findall(text)]
+
+
+def query_terms(query: str, search_type: Optional[str] = None) -> List[str]:
+    """
+    Build the English search terms of a (possibly Korean) query
+
+    Args:
+        query: User query
+        search_type: search_type argument of the agent builder
+
+    Returns:
+        Stemmed terms, including expansions of Korean keywords, the search type and identifiers
+    """
+    terms = tokenize(query)
+    for keyword, expansion in KEYWORD_TERMS.items():
+        if keyword in query:
+            terms.extend(expansion)
+    if search_type:
+        terms.extend(SEARCH_TYPE_TERMS.get(search_type, [search_type]))
+    for pattern, expansion in IDENTIFIER_PATTERNS:
+        if pattern.search(query):
+            terms.extend(expansion)
+    return [stem(term) for term in terms]
+
+
+class ToolIndex:
+    """Term index over a tool catalog's names, descriptions and parameter descriptions"""
+
+    def __init__(self, tools: Sequence):
+        self.tools = list(tools)
+        self.documents: List[Counter] = []
+        document_frequency: Counter = Counter()
+        for tool in self.tools:
+            spec = tool.tool_spec
+            document = Counter()
+            for term in tokenize(spec["name"]):
+                document[term] += NAME_WEIGHT
+            for term in tokenize(spec.get("description", "")):
+                document[term] += 1
+            properties = spec.get("inputSchema", {}).get("json", {}).get("properties", {})
+            for name, schema in properties.items():
+                for term in tokenize(f"{name} {schema.get('description', '')}"):
+                    document[term] += 0.5
+            self.documents.append(document)
+            document_frequency.update(document.keys())
+        self._cores: Dict[tuple, set] = {}
+        count = len(self.tools)
+        self.idf = {term: math.log(1 + count / frequency) for term, frequency in document_frequency.items()}
+
+    def rank(self, terms: Iterable[str]) -> List[tuple]:
+        """Score every tool against the terms, best first; ties keep the catalog order"""
+        weights = Counter(terms)
+        scored = []
+        for position, (tool, document) in enumerate(zip(self.tools, self.documents)):
+            score = sum(
+                self.idf.get(term, 0.0) * math.log(1 + document[term]) * min(repeats, 2)
+                for term, repeats in weights.items()
+                if term in document
+            )
+            scored.append((score, position, tool))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(score, tool) for score, _, tool in scored]
+
+
+    def core(self, search_type: Optional[str], top_k: int) -> set:
+        """Names of the tools ranked best for a search type alone; the same for every query of that type"""
+        key = (search_type, top_k)
+        if key not in self._cores:
+            ranked = self.rank(query_terms("", search_type)) if search_type else []
+            self._cores[key] = {tool.tool_name for score, tool in ranked[:top_k] if score > 0}
+        return self._cores[key]
+
+
+_indexes: Dict[tuple, ToolIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(tools: Sequence) -> ToolIndex:
+    """Get the index of a tool catalog, built once per distinct catalog"""
+    key = tuple(tool.tool_name for tool in tools)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = ToolIndex(tools)
+            _indexes[key] = index
+        return index
+
+
+def tools_used_in(messages: Optional[List[dict]]) -> set:
+    """Names of the tools called in a conversation history"""
+    used = set()
+    for message in messages or []:
+        for block in message.get("content", []):
+            if "toolUse" in block:
+                used.add(block["toolUse"]["name"])
+    return used
+
+
+def select_tools(
+    tools: Sequence,
+    query: str,
+    search_type: Optional[str] = None,
+    history: Optional[List[dict]] = None,
+    top_k: int = TOP_K,
+    top_up: int = TOP_UP,
+) -> list:
+    """
+    Pick the tools of a large catalog that are relevant to a query
+
+    The tool definitions open the Bedrock prompt, so the cached prefix only
+    matches when two turns send exactly the same tools. Most queries therefore
+    get the fixed subset ranked best for their search type; a query's own
+    `top_up` best matches are added only when that subset lacks them, at the
+    cost of a prompt cache miss. Tools already called in the history are always
+    kept so follow-up turns can refer to them. When no tool matches well, every
+    tool is returned.
+
+    Args:
+        tools: Tool catalog of one MCP server
+        query: User query
+        search_type: search_type argument of the agent builder
+        history: Conversation messages the agent will start from
+        top_k: Number of tools in the fixed subset of a search type
+        top_up: Number of best query matches that are added when missing from the fixed subset
+
+    Returns:
+        The selected tools in catalog order
+    """
+    tools = list(tools)
+    if TOOL_ROUTING != "Enable" or len(tools) < MIN_CATALOG or len(tools) <= top_k:
+        return tools
+
+    index = get_index(tools)
+    ranked = index.rank(query_terms(query, search_type))
+    core = index.core(search_type, top_k)
+    if ranked[0][0] < MIN_SCORE or not core:
+        logger.info(f"tool routing: no confident match (best {ranked[0][0]:.2f}), using all {len(tools)} tools")
+        return tools
+
+    selected = core | {tool.tool_name for score, tool in ranked[:top_up] if score >= MIN_SCORE}
+    selected |= tools_used_in(history)
+    subset = [tool for tool in tools if tool.tool_name in selected]
+    logger.info(f"tool routing: {len(subset)} of {len(tools)} tools: {[tool.tool_name for tool in subset]}")
+    return subset
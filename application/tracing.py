@@ -0,0 +1,179 @@
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Sequence
+
+from opentelemetry import context as otel_context
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+
+logger = logging.getLogger(__name__)
+
+TRACE_FILE = os.getenv("TRACE_FILE") or None  # JSON lines file spans are appended to
+OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT") or None  # OTLP/HTTP collector
+SERVICE_NAME = "drug-discovery-agent"
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Appends finished spans to a local file, one JSON object per line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = []
+        for span in spans:
+            parent = span.parent
+            lines.append(
+                json.dumps(
+                    {
+                        "name": span.name,
+                        "trace_id": format(span.context.trace_id, "032x"),
+                        "span_id": format(span.context.span_id, "016x"),
+                        "parent_id": format(parent.span_id, "016x") if parent else None,
+                        "start": span.start_time / 1e9,
+                        "duration_ms": round((span.end_time - span.start_time) / 1e6, 3),
+                        "status": span.status.status_code.name,
+                        "attributes": dict(span.attributes or {}),
+                    },
+                    ensure_ascii=False,
+                    default=str,
+                )
+            )
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            return SpanExportResult.SUCCESS
+        except Exception as e:
+            logger.error(f"Failed to write spans to {self.path}: {e}")
+            return SpanExportResult.FAILURE
+
+    def shutdown(self):
+        pass
+
+
+class _NoopSpan:
+    """Stands in for a span when tracing is disabled"""
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def record_exception(self, exception, attributes=None):
+        pass
+
+    def end(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+_tracer: Optional[trace.Tracer] = None
+_provider: Optional[TracerProvider] = None
+# Root span context of each session's current turn; spans started on threads
+# that did not inherit a context (e.g. Strands' tool thread pool) attach here
+_session_contexts: Dict[str, otel_context.Context] = {}
+
+
+def configure(trace_file: Optional[str] = TRACE_FILE, otlp_endpoint: Optional[str] = OTLP_ENDPOINT):
+    """
+    Enable tracing if a trace file or an OTLP endpoint is configured
+
+    The provider is installed globally, so the spans Strands creates for
+    agents, model calls and tools end up in the same traces.
+    """
+    global _tracer, _provider
+    if _tracer is not None or not (trace_file or otlp_endpoint):
+        return
+
+    _provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+    if trace_file:
+        _provider.add_span_processor(BatchSpanProcessor(JsonLinesSpanExporter(trace_file)))
+        logger.info(f"Tracing to file: {trace_file}")
+    if otlp_endpoint:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        _provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        logger.info(f"Tracing to OTLP endpoint: {otlp_endpoint}")
+    trace.set_tracer_provider(_provider)
+    _tracer = trace.get_tracer(SERVICE_NAME)
+
+
+def is_enabled() -> bool:
+    return _tracer is not None
+
+
+def _parent_context(session_id: Optional[str]) -> Optional[otel_context.Context]:
+    if session_id and not trace.get_current_span().get_span_context().is_valid:
+        return _session_contexts.get(session_id)
+    return None
+
+
+def _clean(attributes: dict) -> dict:
+    return {k: v for k, v in attributes.items() if v is not None}
+
+
+def span(name: str, session_id: Optional[str] = None, **attributes):
+    """
+    Context manager tracing a block as a child of the current span
+
+    Args:
+        name: Span name (e.g. 'mcp.tool')
+        session_id: Session whose turn the span belongs to if no span is active on this thread
+        **attributes: Span attributes (None values are dropped)
+
+    Returns:
+        A context manager yielding the span (a no-op object when tracing is disabled)
+    """
+    if _tracer is None:
+        return NOOP_SPAN
+    return _tracer.start_as_current_span(
+        name, context=_parent_context(session_id), attributes=_clean(attributes)
+    )
+
+
+def start_span(name: str, session_id: Optional[str] = None, **attributes):
+    """Start a span that is ended explicitly with `span.end()`, e.g. across generator yields"""
+    if _tracer is None:
+        return NOOP_SPAN
+    return _tracer.start_span(name, context=_parent_context(session_id), attributes=_clean(attributes))
+
+
+@contextmanager
+def turn_span(name: str, session_id: str, **attributes):
+    """Trace a whole turn and make it the fallback parent of the session's spans"""
+    if _tracer is None:
+        yield NOOP_SPAN
+        return
+    with _tracer.start_as_current_span(name, attributes=_clean({"session.id": session_id, **attributes})) as root:
+        turn_context = otel_context.get_current()
+        _session_contexts[session_id] = turn_context
+        try:
+            yield root
+        finally:
+            # A newer turn of the same session may have replaced the entry already
+            if _session_contexts.get(session_id) is turn_context:
+                del _session_contexts[session_id]
+
+
+def shutdown():
+    """Flush pending spans"""
+    if _provider is not None:
+        _provider.shutdown()
+
+
+configure()